@@ -2,11 +2,10 @@
 
 """example_isotope_plot.py: plots cross sections for a couple of isotopes."""
 
-import openmc
 import plotly.graph_objects as go
-import openmc.data
 from tqdm import tqdm
-import os
+
+from nuclear_data_client import get_energy_and_xs
 
 
 # this list will take a long time to process
@@ -24,25 +23,24 @@ candidate_fusion_neutron_multipliers_list = ['Be9', 'Pb204', 'Pb206']
 MT_number = 16
 
 
-nuclear_data_path = os.path.dirname(os.environ["OPENMC_CROSS_SECTIONS"]) + '/neutron'
-
 fig = go.Figure()
 
 # this loop plots n,2n cross-sections for all isotopes
 # in the candidate_fusion_neutron_multipliers_list
 
+# the cross sections are loaded from the nuclear data files in the OPENMC_CROSS_SECTIONS directory
+# or from nuclear_data_server.py if it is running, which avoids loading them again on every run
+
 for isotope_name in tqdm(candidate_fusion_neutron_multipliers_list):
-    isotope_object = openmc.data.IncidentNeutron.from_hdf5(os.path.join(nuclear_data_path, isotope_name+'.h5'))  # you may have to change this directory
-    energy = isotope_object.energy['294K']  # 294K is the temperature for endf, others use 293K
-    if MT_number in isotope_object.reactions.keys():
-        cross_section = isotope_object[MT_number].xs['294K'](energy)
+    try:
+        energy, cross_section = get_energy_and_xs(isotope_name, MT_number, '294K')  # 294K is the temperature for endf, others use 293K
         fig.add_trace(go.Scatter(x=energy,
                                  y=cross_section,
                                  mode='lines',
                                  name=isotope_name + ' MT ' + str(MT_number)
                                 )
                      )
-    else:
+    except KeyError:
         print('isotope ', isotope_name, ' does not have the MT reaction number ', MT_number)
 
 
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""4_example_enrichment_sweep.py: plots Li4SiO4 tritium production for many lithium enrichments with a slider."""
+
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from enrichment_sweep import make_enrichment_basis, sweep_enrichment
+
+
+Endf_MT_number = 205  # MT number 205 is (n,Xt) reaction
+
+# the three calculate_cexs calls happen here, once, for all enrichments
+basis = make_enrichment_basis('Li4SiO4', Endf_MT_number, density_g_per_cm3=1.877)
+
+# a thousand enrichments evaluated in one vectorized call on a log spaced energy grid
+energy = np.logspace(-5, np.log10(20e6), 1000)
+enrichments = np.linspace(0, 100, 1001)
+
+start_time = time.time()
+energy, cross_sections = sweep_enrichment(basis, enrichments, energy=energy)
+print('calculated', cross_sections.shape, 'cross section values in', time.time() - start_time, 's')
+
+fig = go.Figure()
+
+# one trace per slider step, only the selected enrichment is visible
+slider_enrichments = enrichments[::50]
+for enrichment, cross_section in zip(slider_enrichments, cross_sections[::50]):
+    fig.add_trace(go.Scatter(x=energy,
+                             y=cross_section,
+                             mode='lines',
+                             visible=bool(enrichment == 60),
+                             name='Li4SiO4 ' + str(enrichment) + '% Li6 (n,t)')
+                  )
+
+steps = []
+for counter, enrichment in enumerate(slider_enrichments):
+    steps.append({'method': 'update',
+                  'label': str(enrichment),
+                  'args': [{'visible': [counter == i for i in range(len(slider_enrichments))]}]})
+
+fig.update_layout(
+      title='Li4SiO4 cross section as a function of lithium enrichment',
+      xaxis={'title': 'Energy (eV)', 'type': 'log'},
+      yaxis={'title': 'Macroscopic Cross Section (1/cm)', 'type': 'log'},
+      sliders=[{'active': list(slider_enrichments).index(60),
+                'currentvalue': {'prefix': 'Li6 enrichment (atom %): '},
+                'steps': steps}]
+)
+
+
+fig.write_html("4_example_enrichment_sweep.html")
+try:
+    fig.write_html("/my_openmc_workshop/4_example_enrichment_sweep.html")
+# ensures script works for both inside and outside docker container enviroment
+except (FileNotFoundError, NotADirectoryError):
+    pass
+
+fig.show()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""5_example_isotope_temperature_plot.py: plots an isotope cross section at several temperatures from one data load."""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from temperature_xs import load_temperature_grids, interpolate_temperature
+
+
+isotope_name = 'Pb208'
+
+# MT number for the (n,gamma) reaction, the resonances of which broaden with temperature
+MT_number = 102
+
+# all the temperatures in the nuclear data file are read in one go
+temperature_grids = load_temperature_grids(isotope_name, MT_number)
+print('temperatures available for', isotope_name, temperature_grids['temperatures'], 'K')
+
+# blanket temperatures similar to those used in task 8, converted from C to K
+temperatures_in_C = np.array([300, 500, 700, 900])
+energy, cross_sections = interpolate_temperature(temperature_grids, temperatures_in_C + 273.15)
+
+fig = go.Figure()
+
+for temperature_in_C, cross_section in zip(temperatures_in_C, cross_sections):
+    fig.add_trace(go.Scatter(x=energy,
+                             y=cross_section,
+                             mode='lines',
+                             name=isotope_name + ' MT ' + str(MT_number) + ' at ' + str(temperature_in_C) + ' C'
+                            )
+                 )
+
+fig.update_layout(
+      title='Isotope cross sections at different temperatures - MT ' + str(MT_number),
+      xaxis={'title': 'Energy (eV)', 'type': 'log'},
+      yaxis={'title': 'Cross section (barns)', 'type': 'log'}
+)
+
+fig.write_html("5_example_isotope_temperature_plot.html")
+try:
+    fig.write_html("/my_openmc_workshop/5_example_isotope_temperature_plot.html")
+# ensures script works for both inside and outside docker container enviroment
+except (FileNotFoundError, NotADirectoryError):
+    pass
+
+fig.show()
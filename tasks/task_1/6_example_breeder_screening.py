@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""6_example_breeder_screening.py: ranks candidate breeder materials using a multigroup cross section library."""
+
+import time
+
+import numpy as np
+import openmc
+import plotly.graph_objects as go
+
+from multigroup_library import open_library, composition_matrix, screen_compositions
+
+
+# candidate breeder materials at 500 C, densities from http://aries.ucsd.edu/LIB/PROPS/PANOS/matintro.html
+candidate_breeders = {'Li4SiO4': ({'Li': 4.0, 'Si': 1.0, 'O': 4.0}, 2.32),
+                      'Li2TiO3': ({'Li': 2.0, 'Ti': 1.0, 'O': 3.0}, 2.899),
+                      'Pb84.2Li15.8': ({'Pb': 84.2, 'Li': 15.8}, 99.90*(0.1-16.8e-6*500)),
+                      'F2Li2BeF2': ({'F': 4.0, 'Li': 2.0, 'Be': 1.0}, 2.214 - 4.2e-4 * 500),
+                      'Li': ({'Li': 1.0}, 0.515 - 1.01e-4 * (500 - 200))}
+
+materials = []
+for breeder_material_name, (elements, density) in candidate_breeders.items():
+    material = openmc.Material(name=breeder_material_name)
+    for element, element_number in elements.items():
+        material.add_element(element, element_number, percent_type='ao')
+    material.set_density('g/cm3', density)
+    materials.append(material)
+
+Endf_MT_numbers = [205, 16]  # MT number 205 is (n,Xt) and 16 is (n,2n)
+
+# the pointwise data is collapsed once and saved, later runs just load the library unless the nuclides or MT numbers change
+nuclides = sorted(set([nuclide for material in materials for nuclide in material.get_nuclides()]))
+library = open_library('breeder_library.npz', nuclides, Endf_MT_numbers)
+
+# hundreds of candidate compositions, each breeder at 100 lithium enrichments (atom density held constant)
+enrichments = np.linspace(0, 1, 100)
+natural_atom_densities = composition_matrix(materials, library)
+Li6_index = library['nuclides'].index('Li6')
+Li7_index = library['nuclides'].index('Li7')
+lithium_atom_densities = natural_atom_densities[:, Li6_index] + natural_atom_densities[:, Li7_index]
+
+atom_densities = np.repeat(natural_atom_densities[:, np.newaxis, :], len(enrichments), axis=1)
+atom_densities[:, :, Li6_index] = np.outer(lithium_atom_densities, enrichments)
+atom_densities[:, :, Li7_index] = np.outer(lithium_atom_densities, 1. - enrichments)
+atom_densities = atom_densities.reshape(-1, len(library['nuclides']))
+
+start_time = time.time()
+reaction_rates = screen_compositions(library, atom_densities, group_structure='VITAMIN-J-175')
+print('screened', len(atom_densities), 'compositions in', time.time() - start_time, 's')
+
+tritium_production = reaction_rates[:, Endf_MT_numbers.index(205), :].sum(axis=1).reshape(len(materials), len(enrichments))
+
+fig = go.Figure()
+
+for breeder_material_name, tritium_production_rates in zip(candidate_breeders.keys(), tritium_production):
+    fig.add_trace(go.Scatter(x=enrichments * 100,
+                             y=tritium_production_rates,
+                             mode='lines',
+                             name=breeder_material_name + ' (n,Xt)')
+                  )
+
+fig.update_layout(
+      title='Group collapsed tritium production in candidate breeder materials (VITAMIN-J-175, fusion spectrum)',
+      xaxis={'title': 'Li6 enrichment (atom %)'},
+      yaxis={'title': 'Tritium production per unit flux (1/cm)'}
+)
+
+
+fig.write_html("6_example_breeder_screening.html")
+try:
+    fig.write_html("/my_openmc_workshop/6_example_breeder_screening.html")
+# ensures script works for both inside and outside docker container enviroment
+except (FileNotFoundError, NotADirectoryError):
+    pass
+
+fig.show()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""enrichment_sweep.py: macroscopic cross sections of lithium breeders for many Li6 enrichments at once."""
+
+import re
+
+import numpy as np
+import openmc
+from openmc.data import AVOGADRO, atomic_mass, atomic_weight
+
+
+def get_elements_and_numbers(chemical_equation):
+    # splits a chemical formula such as 'Pb84.2Li15.8' into ['Pb', 'Li'] and [84.2, 15.8]
+    chemical_equation_chopped_up = [a for a in re.split(r'([A-Z][a-z]*)', chemical_equation) if a]
+    elements = []
+    element_numbers = []
+
+    for counter, part in enumerate(chemical_equation_chopped_up):
+        if part.isalpha():
+            elements.append(part)
+            if counter + 1 < len(chemical_equation_chopped_up) and not chemical_equation_chopped_up[counter + 1].isalpha():
+                element_numbers.append(float(chemical_equation_chopped_up[counter + 1]))
+            else:
+                element_numbers.append(1.0)
+    return elements, element_numbers
+
+
+def _macroscopic_xs(material, Endf_MT_number):
+    energy, data = openmc.calculate_cexs(material, 'material', [Endf_MT_number])
+    return energy, data[0]
+
+
+def make_enrichment_basis(breeder_material_name, Endf_MT_number, density_g_per_cm3=None, atoms_per_barn_cm=None):
+    """Precomputes the cross section basis vectors needed by sweep_enrichment.
+
+    The macroscopic cross section of a breeder is linear in the Li6 / Li7 split
+    at a fixed number of formula units, so three calculate_cexs calls (non lithium
+    elements, pure Li6 and pure Li7, each at one formula unit per barn-cm) are
+    enough to find it for any enrichment. The density is either held in g/cm3,
+    in which case the atom density follows the molar mass of each enrichment, or
+    held in atom/b-cm as in example_material_extra_plot.make_materials.
+    """
+
+    if (density_g_per_cm3 is None) == (atoms_per_barn_cm is None):
+        raise ValueError('Exactly one of density_g_per_cm3 or atoms_per_barn_cm must be provided')
+
+    elements, element_numbers = get_elements_and_numbers(breeder_material_name)
+    if 'Li' not in elements:
+        raise ValueError('The breeder material ' + breeder_material_name + ' does not contain lithium')
+
+    lithium_atoms = element_numbers[elements.index('Li')]
+    other_elements = [(e, en) for e, en in zip(elements, element_numbers) if e != 'Li']
+
+    energies = []
+    parts = []
+
+    if other_elements:
+        other_material = openmc.Material()
+        for e, en in other_elements:
+            other_material.add_element(e, en, percent_type='ao')
+        other_material.set_density('atom/b-cm', sum([en for e, en in other_elements]))
+        energies_and_xs = _macroscopic_xs(other_material, Endf_MT_number)
+        energies.append(energies_and_xs[0])
+        parts.append(energies_and_xs[1])
+
+    for nuclide in ['Li6', 'Li7']:
+        lithium_material = openmc.Material()
+        lithium_material.add_nuclide(nuclide, 1.0, percent_type='ao')
+        lithium_material.set_density('atom/b-cm', lithium_atoms)
+        energies_and_xs = _macroscopic_xs(lithium_material, Endf_MT_number)
+        energies.append(energies_and_xs[0])
+        parts.append(energies_and_xs[1])
+
+    # puts every part onto the union energy grid so they can be added together
+    energy = energies[0]
+    for other_energy in energies[1:]:
+        energy = np.union1d(energy, other_energy)
+    parts = [np.interp(energy, e, xs) for e, xs in zip(energies, parts)]
+
+    if other_elements:
+        other_xs = parts[0]
+    else:
+        other_xs = np.zeros_like(energy)
+
+    return {'breeder_material_name': breeder_material_name,
+            'Endf_MT_number': Endf_MT_number,
+            'energy': energy,
+            'other_xs': other_xs,
+            'Li6_xs': parts[-2],
+            'Li7_xs': parts[-1],
+            'lithium_atoms': lithium_atoms,
+            'atoms_per_formula': sum(element_numbers),
+            'other_molar_mass': sum([en * atomic_weight(e) for e, en in other_elements]),
+            'density_g_per_cm3': density_g_per_cm3,
+            'atoms_per_barn_cm': atoms_per_barn_cm}
+
+
+def formula_units_per_barn_cm(basis, enrichments):
+    """Returns the number of formula units per barn-cm for each Li6 enrichment (atom percent)."""
+
+    enrichment_fractions = np.asarray(enrichments, dtype=float) / 100.
+
+    if basis['atoms_per_barn_cm'] is not None:
+        return np.full(enrichment_fractions.shape, basis['atoms_per_barn_cm'] / basis['atoms_per_formula'])
+
+    molar_mass = basis['other_molar_mass'] + basis['lithium_atoms'] * (
+        enrichment_fractions * atomic_mass('Li6') + (1. - enrichment_fractions) * atomic_mass('Li7'))
+    return basis['density_g_per_cm3'] * AVOGADRO / molar_mass * 1e-24
+
+
+def sweep_enrichment(basis, enrichments, energy=None):
+    """Returns the macroscopic cross section (1/cm) as a 2D (enrichment x energy) array.
+
+    enrichments are Li6 atom percentages, energy defaults to the union grid of the basis.
+    Pass a coarser energy grid (e.g. np.logspace) to keep thousands of enrichments small in memory.
+    """
+
+    enrichments = np.atleast_1d(np.asarray(enrichments, dtype=float))
+    if np.any(enrichments < 0.) or np.any(enrichments > 100.):
+        raise ValueError('Enrichments must be Li6 atom percentages between 0 and 100')
+
+    if energy is None:
+        energy = basis['energy']
+        other_xs, Li6_xs, Li7_xs = basis['other_xs'], basis['Li6_xs'], basis['Li7_xs']
+    else:
+        energy = np.asarray(energy, dtype=float)
+        other_xs, Li6_xs, Li7_xs = [np.interp(energy, basis['energy'], basis[key])
+                                    for key in ['other_xs', 'Li6_xs', 'Li7_xs']]
+
+    enrichment_fractions = enrichments / 100.
+    cross_sections = np.multiply.outer(enrichment_fractions, Li6_xs - Li7_xs)
+    cross_sections += other_xs + Li7_xs
+    cross_sections *= formula_units_per_barn_cm(basis, enrichments)[:, np.newaxis]
+
+    return energy, cross_sections
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+"""multigroup_library.py: collapses pointwise cross sections into group structures for fast breeder screening."""
+
+import os
+
+import numpy as np
+import openmc
+import openmc.mgxs
+
+
+def fusion_weight_function(energy, kT=0.0253, fusion_energy=14.08e6, fusion_kT=20000.0, fusion_peak_fraction=0.25):
+    """Representative fusion blanket spectrum (per unit energy) used to weight the group collapse.
+
+    A thermal Maxwellian joined to a 1/E slowing down spectrum up to the fusion
+    energy, plus a Gaussian D-T peak with the Muir width (atomic mass ratio of 5)
+    that contains fusion_peak_fraction of the total weight.
+    """
+
+    energy = np.asarray(energy, dtype=float)
+
+    # the Maxwellian and 1/E parts are joined with equal values at 4kT
+    join_energy = 4 * kT
+    maxwellian_scaling = (1. / join_energy) / (join_energy / kT**2 * np.exp(-join_energy / kT))
+    slowing_down = np.where(energy < join_energy,
+                            maxwellian_scaling * energy / kT**2 * np.exp(-energy / kT),
+                            1. / energy)
+    slowing_down[energy > fusion_energy] = 0.
+
+    # integral of the slowing down part, the Maxwellian part is integrated by parts
+    slowing_down_integral = (maxwellian_scaling * (1. - np.exp(-join_energy / kT) * (1. + join_energy / kT))
+                             + np.log(fusion_energy / join_energy))
+
+    sigma = np.sqrt(2. * fusion_energy * fusion_kT / 5.)
+    peak = np.exp(-0.5 * ((energy - fusion_energy) / sigma)**2) / (sigma * np.sqrt(2 * np.pi))
+    peak_scaling = slowing_down_integral * fusion_peak_fraction / (1. - fusion_peak_fraction)
+
+    return slowing_down + peak_scaling * peak
+
+
+def _integration_grid(energy, group_edges, points_per_decade=50):
+    # adds the group edges and log spaced points so that every group is resolved by the trapezoid rule
+    lower = max(energy[0], group_edges[0])
+    upper = min(energy[-1], group_edges[-1])
+    log_points = np.logspace(np.log10(lower), np.log10(upper), int(points_per_decade * np.log10(upper / lower)) + 2)
+    return np.union1d(np.union1d(energy, group_edges), log_points)
+
+
+def group_weights(group_edges, weight_function=fusion_weight_function):
+    """Returns the integral of the weight function in each group, normalised to one."""
+
+    group_edges = np.asarray(group_edges, dtype=float)
+    grid = _integration_grid(group_edges, group_edges)
+    weight = weight_function(grid)
+    cumulative = np.concatenate(([0.], np.cumsum(np.diff(grid) * 0.5 * (weight[1:] + weight[:-1]))))
+    weights = np.diff(cumulative[np.searchsorted(grid, group_edges)])
+    return weights / weights.sum()
+
+
+def collapse_xs(energy, xs, group_edges, weight_function=fusion_weight_function):
+    """Collapses pointwise cross sections to group cross sections, sum(xs * w dE) / sum(w dE) per group.
+
+    xs can be a 1D array or a 2D array (one reaction per row) on the energy grid.
+    """
+
+    energy = np.asarray(energy, dtype=float)
+    xs = np.atleast_2d(np.asarray(xs, dtype=float))
+    group_edges = np.asarray(group_edges, dtype=float)
+
+    grid = _integration_grid(energy, group_edges)
+    weight = weight_function(grid)
+    xs_on_grid = np.array([np.interp(grid, energy, reaction_xs) for reaction_xs in xs])
+
+    # cumulative trapezoid integrals evaluated exactly at the group edges
+    edge_indices = np.searchsorted(grid, np.clip(group_edges, grid[0], grid[-1]))
+    de = np.diff(grid)
+
+    integrand = xs_on_grid * weight
+    cumulative_reaction = np.zeros_like(xs_on_grid)
+    cumulative_reaction[:, 1:] = np.cumsum(de * 0.5 * (integrand[:, 1:] + integrand[:, :-1]), axis=1)
+    cumulative_weight = np.zeros_like(grid)
+    cumulative_weight[1:] = np.cumsum(de * 0.5 * (weight[1:] + weight[:-1]))
+
+    weight_per_group = np.diff(cumulative_weight[edge_indices])
+    reaction_per_group = np.diff(cumulative_reaction[:, edge_indices], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        group_xs = np.where(weight_per_group > 0., reaction_per_group / weight_per_group, 0.)
+
+    return group_xs
+
+
+def make_multigroup_library(nuclides, Endf_MT_numbers, group_structures=('VITAMIN-J-175', 'CCFE-709'),
+                            weight_function=fusion_weight_function):
+    """Collapses the microscopic cross sections (barns) of each nuclide and MT number into each group structure.
+
+    The pointwise data of each nuclide is loaded once with calculate_cexs.
+    Returns a dictionary that can be saved with save_library.
+    """
+
+    library = {'nuclides': list(nuclides),
+               'Endf_MT_numbers': list(Endf_MT_numbers),
+               'cross_sections': os.environ.get('OPENMC_CROSS_SECTIONS', ''),
+               'group_structures': {}}
+
+    group_edges = {name: np.array(openmc.mgxs.GROUP_STRUCTURES[name]) for name in group_structures}
+    group_xs = {name: np.zeros((len(nuclides), len(Endf_MT_numbers), len(edges) - 1))
+                for name, edges in group_edges.items()}
+
+    for counter, nuclide in enumerate(nuclides):
+        energy, data = openmc.calculate_cexs(nuclide, 'nuclide', list(Endf_MT_numbers))
+        for name, edges in group_edges.items():
+            group_xs[name][counter] = collapse_xs(energy, data, edges, weight_function)
+
+    for name, edges in group_edges.items():
+        library['group_structures'][name] = {'edges': edges,
+                                             'xs': group_xs[name],
+                                             'weights': group_weights(edges, weight_function)}
+
+    return library
+
+
+def save_library(library, filename):
+    arrays = {'nuclides': np.array(library['nuclides']),
+              'Endf_MT_numbers': np.array(library['Endf_MT_numbers']),
+              'cross_sections': np.array(library['cross_sections']),
+              'group_structure_names': np.array(list(library['group_structures'].keys()))}
+    for name, group_structure in library['group_structures'].items():
+        for key, value in group_structure.items():
+            arrays[name + '/' + key] = value
+    np.savez_compressed(filename, **arrays)
+
+
+def load_library(filename):
+    arrays = np.load(filename)
+    library = {'nuclides': arrays['nuclides'].tolist(),
+               'Endf_MT_numbers': arrays['Endf_MT_numbers'].tolist(),
+               # libraries saved before the cross sections were recorded never match
+               'cross_sections': arrays['cross_sections'].tolist() if 'cross_sections' in arrays else None,
+               'group_structures': {}}
+    for name in arrays['group_structure_names'].tolist():
+        library['group_structures'][name] = {key: arrays[name + '/' + key] for key in ['edges', 'xs', 'weights']}
+    return library
+
+
+def library_matches(library, nuclides, Endf_MT_numbers, group_structures=('VITAMIN-J-175', 'CCFE-709'),
+                    weight_function=fusion_weight_function):
+    """Returns True if the library was made for these nuclides, MT numbers, group structures and weight function.
+
+    The weight function is compared through the group weights it gives, and the
+    cross section data through the OPENMC_CROSS_SECTIONS path.
+    """
+
+    if (library['nuclides'] != list(nuclides) or library['Endf_MT_numbers'] != list(Endf_MT_numbers)
+            or library['cross_sections'] != os.environ.get('OPENMC_CROSS_SECTIONS', '')
+            or list(library['group_structures']) != list(group_structures)):
+        return False
+    for name, group_structure in library['group_structures'].items():
+        edges = np.array(openmc.mgxs.GROUP_STRUCTURES[name])
+        if (group_structure['edges'].shape != edges.shape or not np.array_equal(group_structure['edges'], edges)
+                or not np.allclose(group_structure['weights'], group_weights(edges, weight_function))):
+            return False
+    return True
+
+
+def open_library(filename, nuclides, Endf_MT_numbers, group_structures=('VITAMIN-J-175', 'CCFE-709'),
+                 weight_function=fusion_weight_function):
+    """Returns the library saved in filename, making and saving it first if it is missing or was made for other parameters."""
+
+    if os.path.exists(filename):
+        library = load_library(filename)
+        if library_matches(library, nuclides, Endf_MT_numbers, group_structures, weight_function):
+            return library
+        print('Remaking %s as it was made for other nuclides, MT numbers or group structures' % filename)
+    library = make_multigroup_library(nuclides, Endf_MT_numbers, group_structures, weight_function)
+    save_library(library, filename)
+    return library
+
+
+def composition_matrix(materials, library):
+    """Returns a 2D (material x nuclide) array of atom densities (atom/b-cm) in the library nuclide order."""
+
+    nuclide_index = {nuclide: counter for counter, nuclide in enumerate(library['nuclides'])}
+    atom_densities = np.zeros((len(materials), len(library['nuclides'])))
+
+    for row, material in enumerate(materials):
+        for nuclide, density in material.get_nuclide_atom_densities().items():
+            if nuclide not in nuclide_index:
+                raise ValueError('nuclide ' + nuclide + ' of material ' + str(material.name) + ' is not in the library')
+            atom_densities[row, nuclide_index[nuclide]] = density[1]
+
+    return atom_densities
+
+
+def screen_compositions(library, atom_densities, group_structure='VITAMIN-J-175', group_flux=None):
+    """Estimates group-wise reaction rates for many compositions at once.
+
+    atom_densities is a (composition x nuclide) array from composition_matrix,
+    group_flux defaults to the normalised weighting spectrum of the library.
+    Returns a (composition x MT number x group) array of reaction rates per unit
+    source flux (1/cm), summing over the last axis gives the total rate.
+    """
+
+    groups = library['group_structures'][group_structure]
+    if group_flux is None:
+        group_flux = groups['weights']
+
+    return np.einsum('cn,nmg,g->cmg', np.atleast_2d(atom_densities), groups['xs'], group_flux)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""nuclear_data_client.py: gets cross sections from nuclear_data_server.py, or from the HDF5 files if it is not running."""
+
+import json
+import os
+import socket
+import tempfile
+
+import numpy as np
+
+
+def get_nuclear_data_path():
+    return os.path.dirname(os.environ["OPENMC_CROSS_SECTIONS"]) + '/neutron'
+
+
+def get_socket_path():
+    return os.environ.get('OPENMC_WORKSHOP_XS_SOCKET', os.path.join(tempfile.gettempdir(), 'openmc_workshop_xs.sock'))
+
+
+def get_shared_directory():
+    # /dev/shm is memory backed on linux so the arrays never touch the disk
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm/openmc_workshop_xs'
+    return os.path.join(tempfile.gettempdir(), 'openmc_workshop_xs')
+
+
+def send_request(request, socket_path=None):
+    if socket_path is None:
+        socket_path = get_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + '\n').encode())
+        return json.loads(client.makefile().readline())
+
+
+def _load_from_hdf5(isotope_name, MT_number, temperature):
+    import openmc.data
+
+    isotope_object = openmc.data.IncidentNeutron.from_hdf5(os.path.join(get_nuclear_data_path(), isotope_name + '.h5'))
+    energy = isotope_object.energy[temperature]
+    if MT_number is None:
+        return energy, None
+    if MT_number not in isotope_object.reactions.keys():
+        raise KeyError('isotope ' + isotope_name + ' does not have the MT reaction number ' + str(MT_number))
+    return energy, isotope_object[MT_number].xs[temperature](energy)
+
+
+def get_energy_and_xs(isotope_name, MT_number=None, temperature='294K'):
+    """Returns the energy grid and the cross section (barns) of an isotope reaction.
+
+    The arrays are memory mapped from the nuclear data server when it is
+    running, otherwise the isotope is loaded from its HDF5 file. A KeyError is
+    raised if the isotope does not have the reaction.
+    """
+
+    try:
+        response = send_request({'isotope': isotope_name, 'MT': MT_number, 'temperature': temperature})
+    except (FileNotFoundError, ConnectionRefusedError):
+        return _load_from_hdf5(isotope_name, MT_number, temperature)
+
+    if 'error' in response:
+        raise KeyError(response['error'])
+
+    energy = np.load(response['energy'], mmap_mode='r')
+    if MT_number is None:
+        return energy, None
+    return energy, np.load(response['xs'], mmap_mode='r')
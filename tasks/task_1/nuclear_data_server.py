@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+"""nuclear_data_server.py: keeps parsed cross sections in shared memory and answers queries over a Unix socket.
+
+Start the server once, in its own terminal or in the background
+    python nuclear_data_server.py &
+then scripts using nuclear_data_client.get_energy_and_xs skip loading the
+HDF5 nuclear data files. The arrays are written to .npy files in /dev/shm
+and the clients memory map them, so nothing is copied through the socket.
+Stop the server with
+    python nuclear_data_server.py --stop
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import socketserver
+import threading
+
+import numpy as np
+import openmc.data
+
+from nuclear_data_client import get_nuclear_data_path, get_shared_directory, get_socket_path, send_request
+
+
+def server_is_running(socket_path):
+    """Returns True if a server accepts connections on the socket, False if it is missing or stale."""
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+class NuclearDataHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.answer(json.loads(line.decode()))
+            except Exception as e:
+                response = {'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode())
+            if response.get('shutdown'):
+                threading.Thread(target=self.server.shutdown).start()
+
+
+class NuclearDataServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, shared_directory, nuclear_data_path):
+        self.shared_directory = shared_directory
+        self.nuclear_data_path = nuclear_data_path
+        self.isotopes = {}
+        self.arrays = {}
+        self.lock = threading.Lock()
+
+        # the socket and arrays of a running server are still in use by its clients
+        if server_is_running(socket_path):
+            raise RuntimeError('A nuclear data server is already running on ' + socket_path +
+                               ', stop it with python nuclear_data_server.py --stop')
+
+        # files left by a previous server may belong to different nuclear data
+        shutil.rmtree(shared_directory, ignore_errors=True)
+        os.makedirs(shared_directory)
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        socketserver.UnixStreamServer.__init__(self, socket_path, NuclearDataHandler)
+
+    def get_isotope(self, isotope_name):
+        if isotope_name not in self.isotopes:
+            print('loading', isotope_name)
+            self.isotopes[isotope_name] = openmc.data.IncidentNeutron.from_hdf5(
+                os.path.join(self.nuclear_data_path, isotope_name + '.h5'))
+        return self.isotopes[isotope_name]
+
+    def share_array(self, key, make_array):
+        # each array is written once and then memory mapped by every client
+        if key not in self.arrays:
+            filename = os.path.join(self.shared_directory, key + '.npy')
+            np.save(filename + '.tmp.npy', make_array())
+            os.replace(filename + '.tmp.npy', filename)
+            self.arrays[key] = filename
+        return self.arrays[key]
+
+    def answer(self, request):
+        if request.get('shutdown'):
+            return {'shutdown': True}
+
+        isotope_name = request['isotope']
+        temperature = request.get('temperature', '294K')
+        MT_number = request.get('MT')
+
+        with self.lock:
+            isotope_object = self.get_isotope(isotope_name)
+            if temperature not in isotope_object.energy:
+                return {'error': 'isotope ' + isotope_name + ' does not have the temperature ' + temperature,
+                        'temperatures': list(isotope_object.energy.keys())}
+
+            energy = isotope_object.energy[temperature]
+            response = {'energy': self.share_array(isotope_name + '_' + temperature + '_energy', lambda: energy)}
+
+            if MT_number is not None:
+                if MT_number not in isotope_object.reactions.keys():
+                    return {'error': 'isotope ' + isotope_name + ' does not have the MT reaction number ' + str(MT_number)}
+                response['xs'] = self.share_array(isotope_name + '_' + temperature + '_MT' + str(MT_number),
+                                                  lambda: isotope_object[MT_number].xs[temperature](energy))
+
+        return response
+
+
+def main():
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    ap.add_argument('--socket',
+                    default=get_socket_path(),
+                    help='Path of the Unix socket to listen on')
+
+    ap.add_argument('--shared-directory',
+                    default=get_shared_directory(),
+                    help='Directory for the shared memory arrays')
+
+    ap.add_argument('--stop',
+                    action='store_true',
+                    help='Stop a running server')
+
+    args = ap.parse_args()
+
+    if args.stop:
+        send_request({'shutdown': True}, args.socket)
+        return
+
+    server = NuclearDataServer(args.socket, args.shared_directory, get_nuclear_data_path())
+    print('Serving nuclear data on %s' % args.socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(args.socket)
+        shutil.rmtree(args.shared_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""temperature_xs.py: loads every temperature of a cross section once and interpolates between them."""
+
+import os
+
+import numpy as np
+import openmc
+import openmc.data
+
+
+def get_nuclear_data_path():
+    return os.path.dirname(os.environ["OPENMC_CROSS_SECTIONS"]) + '/neutron'
+
+
+def load_temperature_grids(isotope_name, MT_number, nuclear_data_path=None):
+    """Reads all temperatures of an isotope reaction from a single HDF5 load.
+
+    Returns a dictionary with the available temperatures (K), a common energy
+    grid (the union of the grids at each temperature) and a 2D (temperature x
+    energy) array of microscopic cross sections in barns.
+    """
+
+    if nuclear_data_path is None:
+        nuclear_data_path = get_nuclear_data_path()
+
+    isotope_object = openmc.data.IncidentNeutron.from_hdf5(os.path.join(nuclear_data_path, isotope_name + '.h5'))
+
+    if MT_number not in isotope_object.reactions.keys():
+        raise ValueError('isotope ' + isotope_name + ' does not have the MT reaction number ' + str(MT_number))
+
+    # temperature keys are strings such as '294K', sorting them by value allows interpolation
+    temperature_keys = sorted(isotope_object.energy.keys(), key=lambda key: float(key.rstrip('K')))
+
+    energy = isotope_object.energy[temperature_keys[0]]
+    for temperature_key in temperature_keys[1:]:
+        energy = np.union1d(energy, isotope_object.energy[temperature_key])
+
+    reaction = isotope_object[MT_number]
+    cross_sections = np.empty((len(temperature_keys), len(energy)))
+    for counter, temperature_key in enumerate(temperature_keys):
+        cross_sections[counter] = reaction.xs[temperature_key](energy)
+
+    return {'name': isotope_name,
+            'MT_number': MT_number,
+            'temperatures': np.array([float(key.rstrip('K')) for key in temperature_keys]),
+            'energy': energy,
+            'xs': cross_sections}
+
+
+def load_material_temperature_grids(material, MT_number, nuclear_data_path=None):
+    """Loads the macroscopic cross section (1/cm) of a material at every temperature common to its nuclides."""
+
+    nuclide_grids = []
+    atom_densities = []
+    for nuclide, density in material.get_nuclide_atom_densities().items():
+        try:
+            nuclide_grids.append(load_temperature_grids(nuclide, MT_number, nuclear_data_path))
+        except ValueError:
+            # nuclides without this reaction do not contribute
+            continue
+        atom_densities.append(density[1])
+
+    if not nuclide_grids:
+        raise ValueError('no nuclide in material ' + str(material.name) + ' has the MT reaction number ' + str(MT_number))
+
+    temperatures = nuclide_grids[0]['temperatures']
+    energy = nuclide_grids[0]['energy']
+    for grid in nuclide_grids[1:]:
+        temperatures = np.intersect1d(temperatures, grid['temperatures'])
+        energy = np.union1d(energy, grid['energy'])
+
+    if len(temperatures) == 0:
+        available = ', '.join(grid['name'] + ' ' + str(grid['temperatures'].tolist()) + 'K' for grid in nuclide_grids)
+        raise ValueError('the nuclides in material ' + str(material.name) +
+                         ' have no temperature in common, the available temperatures are ' + available)
+
+    cross_sections = np.zeros((len(temperatures), len(energy)))
+    for grid, atom_density in zip(nuclide_grids, atom_densities):
+        temperature_indices = np.searchsorted(grid['temperatures'], temperatures)
+        for counter, temperature_index in enumerate(temperature_indices):
+            cross_sections[counter] += atom_density * np.interp(energy, grid['energy'], grid['xs'][temperature_index])
+
+    return {'name': material.name,
+            'MT_number': MT_number,
+            'temperatures': temperatures,
+            'energy': energy,
+            'xs': cross_sections}
+
+
+def interpolate_temperature(temperature_grids, temperatures, energy=None):
+    """Interpolates linearly between the loaded temperatures for an array of temperatures (K).
+
+    Returns the energy grid and a 2D (temperature x energy) array. An optional
+    energy grid can be given to return the cross sections on fewer points.
+    """
+
+    available_temperatures = temperature_grids['temperatures']
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+
+    if np.any(temperatures < available_temperatures[0]) or np.any(temperatures > available_temperatures[-1]):
+        raise ValueError('Temperatures must be between ' + str(available_temperatures[0]) + 'K and ' +
+                         str(available_temperatures[-1]) + 'K for ' + str(temperature_grids['name']))
+
+    if energy is None:
+        energy = temperature_grids['energy']
+        cross_sections = temperature_grids['xs']
+    else:
+        energy = np.asarray(energy, dtype=float)
+        cross_sections = np.array([np.interp(energy, temperature_grids['energy'], xs) for xs in temperature_grids['xs']])
+
+    if len(available_temperatures) == 1:
+        return energy, np.repeat(cross_sections, len(temperatures), axis=0)
+
+    lower = np.clip(np.searchsorted(available_temperatures, temperatures, side='right') - 1,
+                    0, len(available_temperatures) - 2)
+    fraction = (temperatures - available_temperatures[lower]) / (available_temperatures[lower + 1] - available_temperatures[lower])
+
+    interpolated = cross_sections[lower] * (1. - fraction)[:, np.newaxis]
+    interpolated += cross_sections[lower + 1] * fraction[:, np.newaxis]
+
+    return energy, interpolated
@@ -7,9 +7,14 @@ __author__ = "Jonathan Shimwell"
 import openmc
 import json
 import os
+import sys
 from neutronics_material_maker import Material
 from parametric_plasma_source import Plasma
 
+# plasma_source_cache.py is shared with task 3
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_3'))
+from plasma_source_cache import get_plasma_source_library
+
 # MATERIALS using the neutronics material maker
 
 breeder_material = Material(material_name='Li4SiO4', enrichment=90).neutronics_material
@@ -47,9 +52,9 @@ my_plasma = Plasma(elongation=2.9,
                    major_radius=1.9,
                    triangularity = 0.55)
 # there are other parameters that can be set for the plasma, but we can use the defaults for now
-my_plasma.export_plasma_source('my_custom_plasma_source.so')
 # sets the source poition, direction and energy with predefined plasma parameters (see source_sampling.cpp)
-source.library = './my_custom_plasma_source.so'
+# the source library is only compiled the first time these plasma parameters are used
+source.library = get_plasma_source_library(my_plasma)
 sett.source = source
 
 
@@ -3,7 +3,7 @@ import numpy as np
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 
-from neutronics_material_maker import Material
+from material_factory import get_densities
 
 # Because the neutronics_material_maker makes it easy to adjust material properties, we can easily perform parameter studies
 
@@ -13,7 +13,8 @@ from neutronics_material_maker import Material
 # We will show density as a function of temperature over a larger range, but at correct pressure
 
 temperatures = np.linspace(0.1, 600., 200)
-water_densities = [Material('H2O', temperature_in_C=temperature, pressure_in_Pa=15500000).neutronics_material.density for temperature in temperatures]
+# get_densities evaluates the whole temperature array in one go rather than making a Material for each temperature
+water_densities = get_densities('H2O', temperatures_in_C=temperatures, pressures_in_Pa=15500000)
 
 fig = make_subplots(rows=2, cols=2,
                     subplot_titles=("Water density as a function of temperature (at constant pressure)", "Helium density as a function of temperature (at constant pressure)", "Helium density as a function of pressure (at constant temperature)", ""))
@@ -33,7 +34,7 @@ fig.update_yaxes({'title': 'Density (g/cm3)'}, row=1, col=1)
 # We will show density as a function of temperature over a larger range, but at correct pressure
 
 temperatures = np.linspace(0.1, 600., 200)
-helium_densities = [Material('He', temperature_in_C=temperature, pressure_in_Pa=8000000).neutronics_material.density for temperature in temperatures]
+helium_densities = get_densities('He', temperatures_in_C=temperatures, pressures_in_Pa=8000000)
 
 fig.add_trace(go.Scatter(x=temperatures,
                          y=helium_densities,
@@ -50,7 +51,7 @@ fig.update_yaxes({'title': 'Density (g/cm3)'}, row=1, col=2)
 # Pressure is kept constant in HCPB, however, this is just demonstrating the effect
 
 pressures = np.linspace(1000000., 10000000., 100)
-helium_densities = [Material('He', temperature_in_C=400, pressure_in_Pa=pressure).neutronics_material.density for pressure in pressures]
+helium_densities = get_densities('He', temperatures_in_C=400, pressures_in_Pa=pressures)
 
 fig.add_trace(go.Scatter(x=pressures,
                          y=helium_densities,
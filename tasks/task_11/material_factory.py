@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""material_factory.py: memoized neutronics_material_maker materials and vectorized density calculations."""
+
+from functools import lru_cache
+
+import numpy as np
+from neutronics_material_maker import Material
+
+
+# coolants with CoolProp density equations, the CoolProp fluid name is needed for the vectorized path
+COOLPROP_FLUIDS = {'H2O': 'Water',
+                   'D2O': 'HeavyWater',
+                   'He': 'Helium',
+                   'CO2': 'CarbonDioxide'}
+
+
+@lru_cache(maxsize=1024)
+def make_material(material_name, enrichment=None, temperature_in_C=None, pressure_in_Pa=None, packing_fraction=None):
+    """Returns the neutronics material, built only once for each combination of arguments.
+
+    The same openmc.Material object is returned for repeated calls, so it should
+    not be modified. Use material.clone() first if changes are needed.
+    """
+
+    kwargs = {'enrichment': enrichment,
+              'temperature_in_C': temperature_in_C,
+              'pressure_in_Pa': pressure_in_Pa,
+              'packing_fraction': packing_fraction}
+    kwargs = {key: value for key, value in kwargs.items() if value is not None}
+
+    return Material(material_name, **kwargs).neutronics_material
+
+
+def get_densities(material_name, temperatures_in_C=None, pressures_in_Pa=None, enrichment=None, packing_fraction=None):
+    """Returns the material density for whole arrays of temperatures and / or pressures.
+
+    For CoolProp coolants the density is evaluated with one PropsSI call on the
+    arrays and scaled to the units used by the neutronics material, other
+    materials fall back to the memoized make_material for each point.
+    """
+
+    temperatures_in_C, pressures_in_Pa = np.broadcast_arrays(
+        np.asarray(temperatures_in_C if temperatures_in_C is not None else np.nan, dtype=float),
+        np.asarray(pressures_in_Pa if pressures_in_Pa is not None else np.nan, dtype=float))
+
+    def to_argument(value):
+        return None if np.isnan(value) else float(value)
+
+    temperatures_and_pressures_given = not (np.isnan(temperatures_in_C).any() or np.isnan(pressures_in_Pa).any())
+
+    if material_name in COOLPROP_FLUIDS and temperatures_and_pressures_given and temperatures_in_C.size > 0:
+        from CoolProp.CoolProp import PropsSI
+
+        # one scalar material gives the unit conversion and packing fraction of the density equation
+        reference_material = make_material(material_name, enrichment, to_argument(temperatures_in_C.flat[0]),
+                                           to_argument(pressures_in_Pa.flat[0]), packing_fraction)
+        reference_density = PropsSI('D', 'T', temperatures_in_C.flat[0] + 273.15, 'P', pressures_in_Pa.flat[0],
+                                    COOLPROP_FLUIDS[material_name])
+        scaling = reference_material.density / reference_density
+
+        densities = PropsSI('D', 'T', temperatures_in_C.ravel() + 273.15, 'P', pressures_in_Pa.ravel(),
+                            COOLPROP_FLUIDS[material_name])
+        return scaling * np.asarray(densities).reshape(temperatures_in_C.shape)
+
+    densities = [make_material(material_name, enrichment, to_argument(temperature), to_argument(pressure), packing_fraction).density
+                 for temperature, pressure in zip(temperatures_in_C.ravel(), pressures_in_Pa.ravel())]
+    return np.array(densities).reshape(temperatures_in_C.shape)
@@ -6,6 +6,8 @@ import os
 import openmc
 import matplotlib.pyplot as plt
 
+from slice_rasterizer import SliceRasterizer
+
 mats = openmc.Materials()
 
 natural_lead = openmc.Material(1, "natural_lead")
@@ -43,15 +45,17 @@ cell_1.fill = natural_lead   # assigning a material to a cell
 
 universe = openmc.Universe(cells=[cell_1])  # HINT: this list will need to include the new cell
 
-# shows the plots
-plt.show(universe.plot(width=(1200, 1200), basis='xz', colors={cell_1: 'blue'}))
-plt.show(universe.plot(width=(1200, 1200), basis='xy', colors={cell_1: 'blue'}))
-plt.show(universe.plot(width=(1200, 1200), basis='yz', colors={cell_1: 'blue'}))
+# makes the xy, xz and yz plots in one go, each slice of the geometry is only found once
+# universe.plot(width=(1200, 1200), basis='xz', colors={cell_1: 'blue'}) plots a single slice with OpenMC
+slices = SliceRasterizer(universe)
+plots = slices.plot_all(width=(1200, 1200), colors={cell_1: 'blue'})
 
 # saves the plots
-universe.plot(width=(1200, 1200), basis='xz', colors={cell_1: 'blue'}).get_figure().savefig('xz_sphere.png')
-universe.plot(width=(1200, 1200), basis='xy', colors={cell_1: 'blue'}).get_figure().savefig('xy_sphere.png')
-universe.plot(width=(1200, 1200), basis='yz', colors={cell_1: 'blue'}).get_figure().savefig('yz_sphere.png')
+for basis, plot in plots.items():
+    plot.get_figure().savefig(basis+'_sphere.png')
+
+# shows the plots
+plt.show()
 
 os.system('cp xz_sphere.png /my_openmc_workshop')
 os.system('cp xy_sphere.png /my_openmc_workshop')
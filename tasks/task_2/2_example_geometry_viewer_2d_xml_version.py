@@ -5,6 +5,8 @@
 import openmc
 import os
 
+from plot_batch import run_plots
+
 mats = openmc.Materials()
 
 natural_lead = openmc.Material(name="natural_lead")
@@ -40,12 +42,9 @@ p.width = (1200, 1200)  # HINT: this might need to be increased to see larger ge
 p.pixels = (400, 400)
 p.color_by = 'material'
 p.colors = {natural_lead: 'blue'}
-plots = openmc.Plots([p])
-plots.export_to_xml()
-
-openmc.plot_geometry()
 
-os.system('convert plot.ppm plot.png')
+# runs the OpenMC plotter and converts the image to plot.png
+run_plots([p])
 os.system('cp plot.png /my_openmc_workshop')
 
 os.system('eog plot.png')
@@ -6,6 +6,8 @@ import openmc.model
 import os
 import matplotlib.pyplot as plt
 
+from slice_rasterizer import SliceRasterizer
+
 
 # MATERIALS
 
@@ -56,13 +58,14 @@ universe = openmc.Universe(cells=[central_sol_cell, first_wall_cell, breeder_bla
 
 # VISULISATION
 
-plt.show(universe.plot(width=(1500, 1500), basis='xz'))
-plt.show(universe.plot(width=(1500, 1500), basis='xy'))
-plt.show(universe.plot(width=(1500, 1500), basis='yz'))
+# makes the xy, xz and yz plots in one go, each slice of the geometry is only found once
+slices = SliceRasterizer(universe)
+plots = slices.plot_all(width=(1500, 1500))
+
+for basis, plot in plots.items():
+    plot.get_figure().savefig(basis+'_tokamak.png')
 
-universe.plot(width=(1500, 1500), basis='xz').get_figure().savefig('xz_tokamak.png')
-universe.plot(width=(1500, 1500), basis='xy').get_figure().savefig('xy_tokamak.png')
-universe.plot(width=(1500, 1500), basis='yz').get_figure().savefig('yz_tokamak.png')
+plt.show()
 
 os.system('cp xz_tokamak.png /my_openmc_workshop')
 os.system('cp xy_tokamak.png /my_openmc_workshop')
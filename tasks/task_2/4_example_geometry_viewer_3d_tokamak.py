@@ -7,6 +7,8 @@ __author__ = "Jonathan Shimwell"
 import openmc
 import os
 
+from plot_batch import make_gallery_plots, run_plots
+
 mats = openmc.Materials()
 
 copper = openmc.Material(name='Copper')
@@ -70,20 +72,17 @@ sett = openmc.Settings()
 sett.export_to_xml()
 
 
-# makes the 3d "cube" style geometry
-vox_plot = openmc.Plot()
-vox_plot.type = 'voxel'
-vox_plot.width = (1500., 1500., 1500.)
-vox_plot.pixels = (200, 200, 200)
-vox_plot.filename = 'plot_3d_tokamak'
-vox_plot.color_by = 'material'
-# vox_plot.colors = {copper: 'blue'}  # materials can be coloured using this command
-plots = openmc.Plots([vox_plot])
-plots.export_to_xml()
+# makes the 3d "cube" style geometry and xy, xz and yz slices with one run of the OpenMC plotter
+plots = make_gallery_plots('tokamak',
+                           width=(1500., 1500., 1500.),
+                           voxel_pixels=(200, 200, 200),
+                           color_by='material')
+# colors={copper: 'blue'} can be added to colour the materials
 
-openmc.plot_geometry()
+# the voxel plot h5 file is converted to a compressed vti and the slices to png files
+# the vti is written a few z planes at a time to limit the memory used
+output_filenames = run_plots(plots)
+print('plots saved as', output_filenames)
 
-# this converts the h5 file to a vti
-os.system('openmc-voxel-to-vtk plot_3d_tokamak.h5 -o plot_3d_tokamak.vti')
 os.system('cp plot_3d_tokamak.vti /my_openmc_workshop')
 os.system('paraview plot_3d_tokamak.vti')  # or visit might work better
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""plot_batch.py: makes several slice and voxel plots with one run of the OpenMC plotter."""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.image
+import numpy as np
+import openmc
+
+from voxel_to_vtk import write_vti
+
+
+# the axes of the full (x, y, z) width that each slice basis uses
+SLICE_AXES = {'xy': (0, 1), 'xz': (0, 2), 'yz': (1, 2)}
+
+
+def make_gallery_plots(name, width, origin=(0., 0., 0.), pixels=(400, 400), voxel_pixels=(200, 200, 200),
+                       color_by='material', colors=None, bases=('xy', 'xz', 'yz'), voxel=True):
+    """Returns xy, xz and yz slice plots named <basis>_<name> and a voxel plot named plot_3d_<name>.
+
+    width is the (x, y, z) width of the region to plot in cm.
+    """
+
+    plots = []
+    for basis in bases:
+        plot = openmc.Plot()
+        plot.basis = basis
+        plot.filename = basis + '_' + name
+        plot.origin = origin
+        plot.width = tuple(width[axis] for axis in SLICE_AXES[basis])
+        plot.pixels = pixels
+        plot.color_by = color_by
+        if colors is not None:
+            plot.colors = colors
+        plots.append(plot)
+
+    if voxel:
+        vox_plot = openmc.Plot()
+        vox_plot.type = 'voxel'
+        vox_plot.filename = 'plot_3d_' + name
+        vox_plot.origin = origin
+        vox_plot.width = width
+        vox_plot.pixels = voxel_pixels
+        vox_plot.color_by = color_by
+        if colors is not None:
+            vox_plot.colors = colors
+        plots.append(vox_plot)
+
+    return plots
+
+
+def read_ppm(filename):
+    """Reads a binary (P6) ppm image as an (height, width, 3) array."""
+
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    # the header is the magic number, width, height and maximum value, which may be separated by comments
+    header = re.compile(rb'(?:\s|#[^\n]*\n)*(\S+)')
+    values = []
+    position = 0
+    for i in range(4):
+        match = header.match(data, position)
+        values.append(match.group(1))
+        position = match.end()
+    if values[0] != b'P6':
+        raise ValueError(filename + ' is not a binary ppm image')
+    width, height, maximum = (int(value) for value in values[1:])
+
+    dtype = np.uint8 if maximum < 256 else np.dtype('>u2')
+    # a single whitespace character separates the header from the pixels
+    image = np.frombuffer(data, dtype=dtype, count=width * height * 3, offset=position + 1)
+    return image.reshape(height, width, 3)
+
+
+def convert_plot(plot, directory='.'):
+    """Converts the output of a plot to png (slices) or vti (voxels) and returns the converted filename."""
+
+    basename = os.path.join(directory, plot.filename)
+
+    if plot.type == 'voxel':
+        write_vti(basename + '.h5', basename + '.vti')
+        return basename + '.vti'
+
+    # newer versions of OpenMC write png files directly
+    if os.path.exists(basename + '.ppm'):
+        image = read_ppm(basename + '.ppm')
+        if image.dtype != np.uint8:
+            # 16 bit images are scaled to values between 0 and 1
+            image = image / 65535.
+        matplotlib.image.imsave(basename + '.png', image)
+    return basename + '.png'
+
+
+def run_plots(plots, directory='.', openmc_exec='openmc', max_workers=None):
+    """Runs the OpenMC plotter once for all the plots, then converts the outputs in a thread pool.
+
+    The geometry, materials and settings xml files must already be in directory.
+    Returns the converted filenames in the order of plots.
+    """
+
+    openmc.Plots(plots).export_to_xml(os.path.join(directory, 'plots.xml'))
+    openmc.plot_geometry(openmc_exec=openmc_exec, cwd=directory)
+
+    # zlib compression and file writing release the GIL, so threads convert the plots in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda plot: convert_plot(plot, directory), plots))
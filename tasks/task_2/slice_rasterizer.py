@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""slice_rasterizer.py: fast 2D slice plots of simple CSG geometries using numpy region tests."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import openmc
+from matplotlib.colors import to_rgb
+
+
+# the horizontal and vertical axes of each basis and the axis normal to the slice
+BASES = {'xy': (0, 1, 2), 'xz': (0, 2, 1), 'yz': (1, 2, 0)}
+
+
+def evaluate_surface(surface, x, y, z):
+    """Returns the value of the surface equation at every point, negative on the - side of the surface."""
+
+    if isinstance(surface, openmc.Sphere):
+        return (x - surface.x0)**2 + (y - surface.y0)**2 + (z - surface.z0)**2 - surface.r**2
+    if isinstance(surface, openmc.ZCylinder):
+        return (x - surface.x0)**2 + (y - surface.y0)**2 - surface.r**2
+    if isinstance(surface, openmc.YCylinder):
+        return (x - surface.x0)**2 + (z - surface.z0)**2 - surface.r**2
+    if isinstance(surface, openmc.XCylinder):
+        return (y - surface.y0)**2 + (z - surface.z0)**2 - surface.r**2
+    if isinstance(surface, openmc.XPlane):
+        return x - surface.x0
+    if isinstance(surface, openmc.YPlane):
+        return y - surface.y0
+    if isinstance(surface, openmc.ZPlane):
+        return z - surface.z0
+    if isinstance(surface, openmc.Plane):
+        return surface.a * x + surface.b * y + surface.c * z - surface.d
+    raise TypeError('Slices of ' + type(surface).__name__ + ' surfaces are not supported')
+
+
+def region_contains(region, x, y, z, surface_values=None):
+    """Returns a boolean array of the points inside the region.
+
+    surface_values caches the surface equations by surface id, as surfaces are
+    usually shared by several cells.
+    """
+
+    if surface_values is None:
+        surface_values = {}
+
+    if region is None:
+        return np.ones(np.shape(x), dtype=bool)
+    if isinstance(region, openmc.Halfspace):
+        if region.surface.id not in surface_values:
+            surface_values[region.surface.id] = evaluate_surface(region.surface, x, y, z)
+        if region.side == '-':
+            return surface_values[region.surface.id] < 0.
+        return surface_values[region.surface.id] > 0.
+    if isinstance(region, openmc.Intersection):
+        inside = np.ones(np.shape(x), dtype=bool)
+        for node in region:
+            inside &= region_contains(node, x, y, z, surface_values)
+        return inside
+    if isinstance(region, openmc.Union):
+        inside = np.zeros(np.shape(x), dtype=bool)
+        for node in region:
+            inside |= region_contains(node, x, y, z, surface_values)
+        return inside
+    if isinstance(region, openmc.Complement):
+        return ~region_contains(region.node, x, y, z, surface_values)
+    raise TypeError('Slices of ' + type(region).__name__ + ' regions are not supported')
+
+
+class SliceRasterizer:
+    """Finds the cell and material at every pixel of slices through a universe of material filled cells.
+
+    Slices are cached by basis, origin, width and pixels, so a slice that is
+    shown and then saved is only found once.
+    """
+
+    def __init__(self, universe):
+        self.universe = universe
+        self.cells = list(universe.cells.values())
+        self._cache = {}
+
+    def rasterize(self, basis='xy', origin=(0., 0., 0.), width=(1200., 1200.), pixels=(400, 400)):
+        """Returns arrays of the cell ids and material ids (-1 for no cell or void) with the first row at the top."""
+
+        key = (basis, tuple(origin), tuple(width), tuple(pixels))
+        if key in self._cache:
+            return self._cache[key]
+
+        horizontal, vertical, normal = BASES[basis]
+        h_min = origin[horizontal] - 0.5 * width[0]
+        v_max = origin[vertical] + 0.5 * width[1]
+        h = h_min + (np.arange(pixels[0]) + 0.5) * width[0] / pixels[0]
+        v = v_max - (np.arange(pixels[1]) + 0.5) * width[1] / pixels[1]
+
+        coordinates = [None, None, None]
+        coordinates[horizontal], coordinates[vertical] = np.meshgrid(h, v)
+        coordinates[normal] = np.full((pixels[1], pixels[0]), float(origin[normal]))
+
+        cell_ids = np.full((pixels[1], pixels[0]), -1)
+        material_ids = np.full((pixels[1], pixels[0]), -1)
+        surface_values = {}
+        for cell in self.cells:
+            if cell.fill is not None and not isinstance(cell.fill, openmc.Material):
+                raise TypeError('Slices of cells filled with ' + type(cell.fill).__name__ + ' are not supported')
+            # as in OpenMC the first cell found at a point is used
+            inside = (cell_ids == -1) & region_contains(cell.region, *coordinates, surface_values)
+            cell_ids[inside] = cell.id
+            if cell.fill is not None:
+                material_ids[inside] = cell.fill.id
+
+        self._cache[key] = (cell_ids, material_ids)
+        return self._cache[key]
+
+    def plot(self, basis='xy', origin=(0., 0., 0.), width=(1200., 1200.), pixels=(400, 400),
+             color_by='cell', colors=None, axes=None, seed=1):
+        """Returns a matplotlib axes of the slice, coloured like openmc.Universe.plot.
+
+        colors is a dictionary of cells or materials to matplotlib colours, others
+        get random colours. Pixels without a cell or material are white.
+        """
+
+        cell_ids, material_ids = self.rasterize(basis, origin, width, pixels)
+        ids = cell_ids if color_by == 'cell' else material_ids
+
+        # colours are found once per id and then looked up for every pixel
+        unique_ids, index = np.unique(ids, return_inverse=True)
+        rng = np.random.default_rng(seed)
+        id_colors = {item.id: to_rgb(color) for item, color in (colors or {}).items()}
+        palette = np.array([(1., 1., 1.) if i == -1 else id_colors.get(i, tuple(rng.random(3))) for i in unique_ids])
+        image = palette[index.reshape(ids.shape)]
+
+        if axes is None:
+            figure, axes = plt.subplots()
+
+        horizontal, vertical, normal = BASES[basis]
+        extent = [origin[horizontal] - 0.5 * width[0], origin[horizontal] + 0.5 * width[0],
+                  origin[vertical] - 0.5 * width[1], origin[vertical] + 0.5 * width[1]]
+        axes.imshow(image, extent=extent)
+        axes.set_xlabel(basis[0] + ' [cm]')
+        axes.set_ylabel(basis[1] + ' [cm]')
+
+        return axes
+
+    def plot_all(self, origin=(0., 0., 0.), width=(1200., 1200.), pixels=(400, 400), color_by='cell', colors=None):
+        """Plots the xy, xz and yz slices, each in its own figure, and returns a dictionary of their axes by basis."""
+
+        return {basis: self.plot(basis, origin, width, pixels, color_by, colors) for basis in ['xy', 'xz', 'yz']}
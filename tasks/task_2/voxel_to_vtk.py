@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""voxel_to_vtk.py: converts OpenMC voxel plot h5 files to VTK image data in the same process."""
+
+import zlib
+
+import h5py
+import numpy as np
+
+
+# VTK names of the numpy types that voxel plots use
+VTK_TYPES = {'int8': 'Int8', 'uint8': 'UInt8', 'int16': 'Int16', 'uint16': 'UInt16',
+             'int32': 'Int32', 'uint32': 'UInt32', 'int64': 'Int64', 'uint64': 'UInt64',
+             'float32': 'Float32', 'float64': 'Float64'}
+
+
+def read_voxel_header(filename):
+    """Returns the number of voxels, voxel width and lower left corner of a voxel plot file."""
+
+    with h5py.File(filename, 'r') as f:
+        return {'dimension': tuple(int(n) for n in f.attrs['num_voxels']),
+                'width': tuple(float(w) for w in f.attrs['voxel_width']),
+                'lower_left': tuple(float(x) for x in f.attrs['lower_left'])}
+
+
+def voxel_to_image_data(filename, array_name='id'):
+    """Returns a vtkImageData of a voxel plot whose cell data uses the numpy array of the voxels without a copy.
+
+    The voxels are stored z, y, x in the h5 file, which flattens to the x fastest
+    order used by VTK, so no transpose is needed.
+    """
+
+    try:
+        import vtk
+        from vtk.util.numpy_support import numpy_to_vtk
+    except (ImportError, ModuleNotFoundError):
+        msg = "Conversion to VTK requested," \
+              "but the Python VTK module is not installed."
+        raise ImportError(msg)
+
+    header = read_voxel_header(filename)
+    nx, ny, nz = header['dimension']
+
+    with h5py.File(filename, 'r') as f:
+        voxels = np.ascontiguousarray(f['data'][()]).ravel()
+
+    grid = vtk.vtkImageData()
+    grid.SetDimensions(nx + 1, ny + 1, nz + 1)
+    grid.SetOrigin(*header['lower_left'])
+    grid.SetSpacing(*header['width'])
+
+    data = numpy_to_vtk(voxels, deep=False)
+    data.SetName(array_name)
+    grid.GetCellData().AddArray(data)
+    grid.GetCellData().SetActiveScalars(array_name)
+
+    # vtk does not own the numpy memory, so the array is kept alive with the grid
+    grid.voxels = voxels
+
+    return grid
+
+
+def write_vti(filename, output, array_name='id', block_size=2**20, slab_size=2**24, compression_level=6):
+    """Writes a voxel plot to a zlib compressed .vti file, reading and compressing it a slab of z planes at a time.
+
+    Only about slab_size bytes of voxels are held in memory however large the
+    plot is. The data is written in the VTK XML appended format, a header of
+    compressed block sizes followed by blocks of block_size uncompressed bytes.
+    """
+
+    header = read_voxel_header(filename)
+    nx, ny, nz = header['dimension']
+    extent = '0 {} 0 {} 0 {}'.format(nx, ny, nz)
+
+    with h5py.File(filename, 'r') as f, open(output, 'wb') as vti:
+        data = f['data']
+        dtype = data.dtype.newbyteorder('<')
+        n_blocks = -(-data.size * dtype.itemsize // block_size)
+
+        vti.write('<?xml version="1.0"?>\n'
+                  '<VTKFile type="ImageData" version="1.0" byte_order="LittleEndian" header_type="UInt64" '
+                  'compressor="vtkZLibDataCompressor">\n'
+                  '  <ImageData WholeExtent="{extent}" Origin="{origin}" Spacing="{spacing}">\n'
+                  '    <Piece Extent="{extent}">\n'
+                  '      <CellData Scalars="{name}">\n'
+                  '        <DataArray type="{type}" Name="{name}" format="appended" offset="0"/>\n'
+                  '      </CellData>\n'
+                  '    </Piece>\n'
+                  '  </ImageData>\n'
+                  '  <AppendedData encoding="raw">\n'
+                  '   _'.format(extent=extent,
+                                origin=' '.join(repr(x) for x in header['lower_left']),
+                                spacing=' '.join(repr(w) for w in header['width']),
+                                name=array_name,
+                                type=VTK_TYPES[dtype.name]).encode())
+
+        # the compressed block sizes are only known once the blocks are written, so space is kept for them
+        header_position = vti.tell()
+        vti.write(np.zeros(3 + n_blocks, dtype='<u8').tobytes())
+
+        compressed_sizes = []
+        buffer = b''
+        planes_per_slab = max(1, slab_size // max(1, nx * ny * dtype.itemsize))
+        for start in range(0, nz, planes_per_slab):
+            buffer += data[start:start + planes_per_slab].astype(dtype, copy=False).tobytes()
+            full_blocks = len(buffer) // block_size
+            for block in range(full_blocks):
+                compressed = zlib.compress(buffer[block * block_size:(block + 1) * block_size], compression_level)
+                compressed_sizes.append(len(compressed))
+                vti.write(compressed)
+            buffer = buffer[full_blocks * block_size:]
+
+        if buffer:
+            compressed = zlib.compress(buffer, compression_level)
+            compressed_sizes.append(len(compressed))
+            vti.write(compressed)
+
+        vti.write(b'\n  </AppendedData>\n</VTKFile>\n')
+
+        vti.seek(header_position)
+        # a last block size of 0 means the last block is full
+        vti.write(np.array([n_blocks, block_size, len(buffer)] + compressed_sizes, dtype='<u8').tobytes())
+
+    print('Writing %s' % output)
@@ -8,6 +8,8 @@ import openmc
 import plotly.graph_objects as go
 import numpy as np
 
+from source_bank import summarise_source_bank
+
 # MATERIALS
 
 mats = openmc.Materials([])
@@ -57,22 +59,23 @@ sett.source = source
 model = openmc.model.Model(geom, mats, sett)
 model.run()
 
-sp = openmc.StatePoint('statepoint.'+str(batches)+'.h5')
-
-print('energy of neutrons =',sp.source['E'])  # these neutrons are all created
-
 energy_bins = np.linspace(0, 20e6, 50)
 
 print('energy_bins', energy_bins)
 
-# Calculate pdf for source energies
-probability, bin_edges = np.histogram(sp.source['E'], energy_bins, density=True)
+# Calculate pdf for source energies, the source bank is read in chunks so
+# large numbers of particles do not need to fit in memory
+summary = summarise_source_bank('statepoint.'+str(batches)+'.h5', energy_bins)
+probability = summary['energy_histogram'].probability()
+
+print('mean energy of neutrons =', summary['energy_moments'].mean, 'eV')  # these neutrons are all created
+print('standard deviation of neutron energy =', summary['energy_moments'].std_dev, 'eV')
 
 fig_energy = go.Figure()
 
 # Plot source energy histogram
 fig_energy.add_trace(go.Scatter(x=energy_bins[:-1],
-                                y=probability*np.diff(energy_bins),
+                                y=probability,
                                 line={'shape': 'hv'},
                                 hoverinfo='text',
                                 name='neutron direction',
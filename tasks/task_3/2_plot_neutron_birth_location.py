@@ -3,7 +3,9 @@
 """3_plot_neutron_birth_location.py: plots neutron birth locations."""
 
 import openmc
-import plotly.graph_objects as go
+
+from birth_location_plots import plot_birth_locations
+from source_bank import read_source_particles
 
 # MATERIALS
 
@@ -47,29 +49,14 @@ sett.source = source
 model = openmc.model.Model(geom, mats, sett)
 model.run()
 
-sp = openmc.StatePoint('statepoint.'+str(batches)+'.h5')
-
-print('birth location of first neutron =', sp.source['r'][0])  # these neutrons are all created
-
-fig_coords = go.Figure()
-
-text = ['Energy = '+str(i)+' eV' for i in sp.source['E']]
-
-# plots 3d poisitons of particles coloured by energy
+# only the first particle is read from the source bank
+print('birth location of first neutron =', read_source_particles('statepoint.'+str(batches)+'.h5', 1)['r'][0])  # these neutrons are all created
 
-fig_coords.add_trace(go.Scatter3d(x=sp.source['r']['x'],
-                                  y=sp.source['r']['y'],
-                                  z=sp.source['r']['z'],
-                                  hovertext=text,
-                                  text=text,
-                                  mode='markers',
-                                  marker={'size': 2,
-                                          'color': sp.source['E'],
-                                  }
-                    )
-                  )
+# plots 3d positions of particles coloured by energy, using a random selection of at most 10000 particles
+# change rendering_mode to 'volume' to plot the density of births instead, which suits large source banks
+rendering_mode = 'points'
 
-fig_coords.update_layout(title='Neutron production coordinates, coloured by energy')
+fig_coords = plot_birth_locations('statepoint.'+str(batches)+'.h5', mode=rendering_mode, budget=10000)
 
 fig_coords.write_html("particle_location.html")
 try:
@@ -6,7 +6,9 @@ __author__ = "Jonathan Shimwell"
 
 import openmc
 import plotly.graph_objects as go
-from plotly.figure_factory import create_quiver
+
+from angular_distribution import analyse_directions, plot_sky_map
+from source_bank import read_source_particles
 
 # MATERIALS
 
@@ -51,24 +53,25 @@ sett.source = source
 model = openmc.model.Model(geom, mats, sett)
 model.run()
 
-sp = openmc.StatePoint('statepoint.'+str(batches)+'.h5')
+# only the first 1000 particles are read from the source bank, larger sources are summarised by the sky map below
+plotted_source = read_source_particles('statepoint.'+str(batches)+'.h5', 1000)
 
-print('birth location of first neutron =', sp.source['r'][0])  # these neutrons are all created
-print('direction of first neutron =', sp.source['u'][0])  # these neutrons are all created
+print('birth location of first neutron =', plotted_source['r'][0])  # these neutrons are all created
+print('direction of first neutron =', plotted_source['u'][0])  # these neutrons are all created
 
-# plot the neutron birth locations and trajectory using a cone plot
+# plot the neutron birth locations and trajectory using a cone plot, a cone for each particle read
 
 fig_directions = go.Figure()
 
 fig_directions.add_trace({
     'type': 'cone',
     'cauto': False,
-    'x': sp.source['r']['x'],
-    'y': sp.source['r']['y'],
-    'z': sp.source['r']['z'],
-    'u': sp.source['u']['x'],
-    'v': sp.source['u']['y'],
-    'w': sp.source['u']['z'],
+    'x': plotted_source['r']['x'],
+    'y': plotted_source['r']['y'],
+    'z': plotted_source['r']['z'],
+    'u': plotted_source['u']['x'],
+    'v': plotted_source['u']['y'],
+    'w': plotted_source['u']['z'],
     'cmin': 0,
     'cmax': 1,
     "anchor": "tail",
@@ -89,3 +92,20 @@ except (FileNotFoundError, NotADirectoryError):  # for both inside and outside d
     pass
 
 fig_directions.show()
+
+
+# bins all the directions on an equal-area grid, the density is 1 everywhere for an isotropic source
+angular_distribution = analyse_directions('statepoint.'+str(batches)+'.h5')
+anisotropy = angular_distribution.anisotropy()
+print('mean direction =', anisotropy['mean_direction'])
+print('chi squared compared to isotropic =', anisotropy['chi_squared'], 'with', anisotropy['degrees_of_freedom'], 'degrees of freedom')
+
+fig_sky_map = plot_sky_map(angular_distribution)
+
+fig_sky_map.write_html("particle_direction_sky_map.html")
+try:
+    fig_sky_map.write_html("/my_openmc_workshop/particle_direction_sky_map.html")
+except (FileNotFoundError, NotADirectoryError):  # for both inside and outside docker container
+    pass
+
+fig_sky_map.show()
@@ -2,12 +2,15 @@
 
 """4_plot_neutron_birth_location_plasma.py plots neutron birth locations."""
 
-import plotly.graph_objects as go
-
 import openmc
 
 from parametric_plasma_source import Plasma
 
+from plasma_source_cache import get_plasma_source_library
+
+from birth_location_plots import plot_birth_locations
+from source_bank import read_source_particles
+
 
 # MATERIALS
 
@@ -44,9 +47,9 @@ my_plasma = Plasma(elongation=2.9,
                    major_radius=1.9,
                    triangularity = 0.55)
 # there are other parameters that can be set for the plasma, but we can use the defaults for now
-my_plasma.export_plasma_source('my_custom_plasma_source.so')
 # sets the source poition, direction and energy with predefined plasma parameters (see source_sampling.cpp)
-source.library = './my_custom_plasma_source.so'
+# the source library is only compiled the first time these plasma parameters are used
+source.library = get_plasma_source_library(my_plasma)
 sett.source = source
 
 
@@ -54,29 +57,14 @@ sett.source = source
 model = openmc.model.Model(geom, mats, sett)
 statepoint_filename = model.run()
 
-sp = openmc.StatePoint(statepoint_filename)
-
-print('birth location of first neutron =', sp.source['r'][0])  # these neutrons are all created
-
-fig_coords = go.Figure()
-
-text = ['Energy = '+str(i)+' eV' for i in sp.source['E']]
-
-# plots 3d poisitons of particles coloured by energy
+# only the first particle is read from the source bank
+print('birth location of first neutron =', read_source_particles(statepoint_filename, 1)['r'][0])  # these neutrons are all created
 
-fig_coords.add_trace(go.Scatter3d(x=sp.source['r']['x'],
-                                  y=sp.source['r']['y'],
-                                  z=sp.source['r']['z'],
-                                  hovertext=text,
-                                  text=text,
-                                  mode='markers',
-                                  marker={'size': 1.,
-                                          'color': sp.source['E']
-                                  }
-                    )
-                  )
+# plots 3d positions of particles coloured by energy, using a random selection of at most 10000 particles
+# change rendering_mode to 'volume' to plot the density of births instead, which suits large source banks
+rendering_mode = 'points'
 
-fig_coords.update_layout(title='Neutron production coordinates, coloured by energy')
+fig_coords = plot_birth_locations(statepoint_filename, mode=rendering_mode, budget=10000, marker_size=1.)
 
 fig_coords.write_html("plasma_particle_location.html")
 try:
@@ -4,12 +4,16 @@
 
 import numpy as np
 import plotly.graph_objects as go
-from plotly.figure_factory import create_quiver
+
+from angular_distribution import analyse_directions, plot_sky_map
+from source_bank import read_source_particles
 
 import openmc
 
 from parametric_plasma_source import Plasma
 
+from plasma_source_cache import get_plasma_source_library
+
 
 # MATERIALS
 
@@ -47,9 +51,9 @@ my_plasma = Plasma(elongation=2.9,
                    major_radius=1.9,
                    triangularity = 0.55)
 # there are other parameters that can be set for the plasma, but we can use the defaults for now
-my_plasma.export_plasma_source('my_custom_plasma_source.so')
 # sets the source poition, direction and energy with predefined plasma parameters (see source_sampling.cpp)
-source.library = './my_custom_plasma_source.so'
+# the source library is only compiled the first time these plasma parameters are used
+source.library = get_plasma_source_library(my_plasma)
 sett.source = source
 
 
@@ -57,9 +61,10 @@ sett.source = source
 model = openmc.model.Model(geom, mats, sett)
 statepoint_filename = model.run()
 
-sp = openmc.StatePoint(statepoint_filename)
+# only the first 1000 particles are read from the source bank, larger sources are summarised by the sky map below
+plotted_source = read_source_particles(statepoint_filename, 1000)
 
-print('direction of first neutron =', sp.source['u'][0])  # these neutrons are all created
+print('direction of first neutron =', plotted_source['u'][0])  # these neutrons are all created
 
 fig_directions = go.Figure()
 
@@ -67,12 +72,12 @@ fig_directions = go.Figure()
 fig_directions.add_trace({
     'type': 'cone',
     'cauto': False,
-    'x': sp.source['r']['x'],
-    'y': sp.source['r']['y'],
-    'z': sp.source['r']['z'],
-    'u': sp.source['u']['x'],
-    'v': sp.source['u']['y'],
-    'w': sp.source['u']['z'],
+    'x': plotted_source['r']['x'],
+    'y': plotted_source['r']['y'],
+    'z': plotted_source['r']['z'],
+    'u': plotted_source['u']['x'],
+    'v': plotted_source['u']['y'],
+    'w': plotted_source['u']['z'],
     'cmin': 0,
     'cmax': 1,
     "anchor": "tail",
@@ -94,3 +99,20 @@ except (FileNotFoundError, NotADirectoryError):  # for both inside and outside d
     pass
 
 fig_directions.show()
+
+
+# bins all the directions on an equal-area grid, the density is 1 everywhere for an isotropic source
+angular_distribution = analyse_directions(statepoint_filename)
+anisotropy = angular_distribution.anisotropy()
+print('mean direction =', anisotropy['mean_direction'])
+print('chi squared compared to isotropic =', anisotropy['chi_squared'], 'with', anisotropy['degrees_of_freedom'], 'degrees of freedom')
+
+fig_sky_map = plot_sky_map(angular_distribution)
+
+fig_sky_map.write_html("plasma_particle_direction_sky_map.html")
+try:
+    fig_sky_map.write_html("/my_openmc_workshop/plasma_particle_direction_sky_map.html")
+except (FileNotFoundError, NotADirectoryError):  # for both inside and outside docker container
+    pass
+
+fig_sky_map.show()
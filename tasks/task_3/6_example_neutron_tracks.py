@@ -7,6 +7,13 @@ __author__ = "Jonathan Shimwell"
 import openmc
 import matplotlib.pyplot as plt
 import os
+import sys
+
+from track_converter import convert_tracks
+
+# voxel_to_vtk.py is shared with task 2
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_2'))
+from voxel_to_vtk import write_vti
 
 # MATERIALS
 mats = openmc.Materials()
@@ -67,13 +74,13 @@ sett.source = source
 
 # Run OpenMC!
 model = openmc.model.Model(geom, mats, sett)
-model.run(tracks=True)  # this creates h5 files with openmc-track-to-vtk
+model.run(tracks=True)  # this creates a h5 track file for each particle
 
-for i in range(1, 11):
-    print('converting h5 track file to vtpi')
-    os.system('openmc-track-to-vtk track_1_1_'+str(i)+'.h5 -o track_1_1_'+str(i))
+# all the h5 track files are read in parallel and combined into a single tracks.vtp file
+number_of_tracks = convert_tracks('track_*.h5', 'tracks.vtp')
+print('converted', number_of_tracks, 'tracks')
 
-# os.system('paraview track_1_1_'+str(i)+'.pvtp')
+# os.system('paraview tracks.vtp')
 
 
 vox_plot = openmc.Plot()
@@ -88,7 +95,7 @@ plots.export_to_xml()
 
 openmc.plot_geometry()
 
-os.system('openmc-voxel-to-vtk plot_3d.h5 -o plot_3d.vti')
+write_vti('plot_3d.h5', 'plot_3d.vti')
 os.system('cp plot_3d.vti /my_openmc_workshop')
 os.system('cp *.vtp /my_openmc_workshop')
 os.system('paraview plot_3d.vti')  # visit might be preferred
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""7_preview_source_distributions.py: plots source energy distributions sampled with numpy instead of running OpenMC."""
+
+import time
+
+import numpy as np
+import openmc
+import plotly.graph_objects as go
+
+from source_sampler import sample_source
+
+
+# the three energy distributions used in 1_plot_neutron_birth_energy.py
+energy_distributions = {'14MeV monoenergetic': openmc.stats.Discrete([14e6], [1]),
+                        'Watt fission': openmc.stats.Watt(a=988000.0, b=2.249e-06),
+                        'Muir fusion': openmc.stats.Muir(e0=14080000.0, m_rat=5.0, kt=20000.0)}
+
+energy_bins = np.linspace(0, 20e6, 200)
+
+fig_energy = go.Figure()
+
+for name, energy_distribution in energy_distributions.items():
+
+    # creates an isotropic point source
+    source = openmc.Source()
+    source.space = openmc.stats.Point((0, 0, 0))
+    source.angle = openmc.stats.Isotropic()
+    source.energy = energy_distribution
+
+    # samples a million neutron births without running a simulation
+    start_time = time.time()
+    samples = sample_source(source, 1000000)
+    print('sampled', len(samples), name, 'neutrons in', time.time() - start_time, 's')
+
+    probability, bin_edges = np.histogram(samples['E'], energy_bins)
+
+    fig_energy.add_trace(go.Scatter(x=energy_bins[:-1],
+                                    y=probability / len(samples),
+                                    line={'shape': 'hv'},
+                                    name=name,
+                            )
+                      )
+
+
+fig_energy.update_layout(
+      title='neutron energy',
+      xaxis={'title': 'Energy (eV)'},
+      yaxis={'title': 'Probability'}
+)
+
+
+fig_energy.write_html("source_preview_energy_histogram.html")
+try:
+    fig_energy.write_html("/my_openmc_workshop/source_preview_energy_histogram.html")
+except (FileNotFoundError, NotADirectoryError):  # for both inside and outside docker container
+    pass
+
+fig_energy.show()
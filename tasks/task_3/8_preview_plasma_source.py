@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""8_preview_plasma_source.py: plots plasma neutron birth locations sampled with numpy instead of running OpenMC."""
+
+import json
+import time
+
+import openmc
+import plotly.graph_objects as go
+
+from parametric_plasma_source import Plasma
+
+from plasma_sampler import NumpyPlasmaSource, compare_with_source_bank
+from plasma_source_cache import get_plasma_source_library
+
+
+# the same plasma as 4_plot_neutron_birth_location_plasma.py, other parameters use the defaults
+plasma_parameters = {'elongation': 2.9,
+                     'minor_radius': 1.118,
+                     'major_radius': 1.9,
+                     'triangularity': 0.55}
+my_plasma = NumpyPlasmaSource(**plasma_parameters)
+
+start_time = time.time()
+# both sources are seeded so the comparison below gives the same result every time
+samples = my_plasma.sample(1000000, seed=1)
+print('sampled', len(samples), 'neutrons in', time.time() - start_time, 's')
+
+
+# the numpy samples are checked against a small run of the compiled plasma source, as in 4_plot_neutron_birth_location_plasma.py
+sett = openmc.Settings()
+sett.batches = 2
+sett.inactive = 0
+sett.particles = 3000
+sett.particle = "neutron"
+sett.run_mode = 'fixed source'
+sett.seed = 1
+source = openmc.Source()
+source.library = get_plasma_source_library(Plasma(**plasma_parameters))
+sett.source = source
+
+sph1 = openmc.Sphere(r=1000, boundary_type='vacuum')
+geom = openmc.Geometry(openmc.Universe(cells=[openmc.Cell(region=-sph1)]))
+model = openmc.model.Model(geom, openmc.Materials([]), sett)
+statepoint_filename = model.run()
+
+comparison = compare_with_source_bank(samples, openmc.StatePoint(statepoint_filename).source)
+for name, (statistic, critical_value) in comparison.items():
+    print('{}: KS statistic {:.4f}, 99% critical value {:.4f}'.format(name, statistic, critical_value))
+
+with open('plasma_source_comparison.json', 'w') as file_object:
+    json.dump({name: {'KS statistic': float(statistic), 'critical value': float(critical_value)}
+               for name, (statistic, critical_value) in comparison.items()}, file_object, indent=2)
+
+# a few thousand particles are enough to show the shape of the plasma
+plotted_samples = samples[:5000]
+
+fig_coords = go.Figure()
+
+fig_coords.add_trace(go.Scatter3d(x=plotted_samples['r']['x'],
+                                  y=plotted_samples['r']['y'],
+                                  z=plotted_samples['r']['z'],
+                                  hoverinfo='skip',
+                                  mode='markers',
+                                  marker={'size': 1.,
+                                          'color': plotted_samples['E'],
+                                          'colorbar': {'title': 'Energy (eV)'}
+                                  }
+                    )
+                  )
+
+fig_coords.update_layout(title='Neutron production coordinates, coloured by energy')
+
+fig_coords.write_html("plasma_source_preview.html")
+try:
+    fig_coords.write_html("/my_openmc_workshop/plasma_source_preview.html")
+except (FileNotFoundError, NotADirectoryError):  # for both inside and outside docker container
+    pass
+
+fig_coords.show()
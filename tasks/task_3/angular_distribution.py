@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""angular_distribution.py: bins neutron birth directions on an equal-area spherical grid and measures anisotropy."""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from source_bank import StreamingMoments, iter_source_bank
+
+
+class AngularDistribution:
+    """Histogram and moments of directions, filled chunk by chunk.
+
+    Directions are binned uniformly in mu = cos(polar angle) and in azimuthal
+    angle, so every bin covers the same solid angle of 4 pi / (n_mu * n_phi).
+    """
+
+    def __init__(self, n_mu=36, n_phi=72):
+        self.mu_bins = np.linspace(-1., 1., n_mu + 1)
+        self.phi_bins = np.linspace(-np.pi, np.pi, n_phi + 1)
+        self.counts = np.zeros((n_mu, n_phi))
+        self.solid_angle = 4. * np.pi / (n_mu * n_phi)
+        # first moment (mean direction) and second moment (mean of the outer product of the direction)
+        self.first_moment = StreamingMoments()
+        self.second_moment = StreamingMoments()
+
+    def add(self, directions):
+        """Adds an (n, 3) array of unit direction vectors."""
+
+        directions = np.asarray(directions, dtype=float)
+        if len(directions) == 0:
+            return
+
+        n_mu, n_phi = self.counts.shape
+        mu = np.clip(directions[:, 2], -1., 1.)
+        phi = np.arctan2(directions[:, 1], directions[:, 0])
+        mu_index = np.minimum(((mu + 1.) * 0.5 * n_mu).astype(np.intp), n_mu - 1)
+        phi_index = np.minimum(((phi + np.pi) / (2. * np.pi) * n_phi).astype(np.intp), n_phi - 1)
+        self.counts += np.bincount(mu_index * n_phi + phi_index, minlength=n_mu * n_phi).reshape(n_mu, n_phi)
+
+        self.first_moment.add(directions)
+        self.second_moment.add((directions[:, :, np.newaxis] * directions[:, np.newaxis, :]).reshape(-1, 9))
+
+    @property
+    def count(self):
+        return self.first_moment.count
+
+    def density(self):
+        """Probability per steradian of each bin, 1 / (4 pi) everywhere for an isotropic source."""
+
+        return self.counts / (self.counts.sum() * self.solid_angle)
+
+    def anisotropy(self):
+        """Returns measures of how far the directions are from isotropic.
+
+        mean_resultant_length is the length of the mean direction (0 when isotropic,
+        1 for a monodirectional source), second_moment_deviation is the largest
+        eigenvalue of the difference between the second moment and I / 3, and
+        chi_squared compares the histogram with a uniform one.
+        """
+
+        second_moment = self.second_moment.mean.reshape(3, 3)
+        expected = self.counts.sum() / self.counts.size
+        chi_squared = ((self.counts - expected)**2).sum() / expected
+        density = self.density() * 4. * np.pi
+
+        return {'mean_direction': self.first_moment.mean,
+                'mean_resultant_length': np.linalg.norm(self.first_moment.mean),
+                'second_moment': second_moment,
+                'second_moment_deviation': np.abs(np.linalg.eigvalsh(second_moment - np.eye(3) / 3.)).max(),
+                'chi_squared': chi_squared,
+                'degrees_of_freedom': self.counts.size - 1,
+                'max_to_min_density_ratio': density.max() / max(density.min(), 1. / self.count)}
+
+
+def analyse_directions(filename, n_mu=36, n_phi=72, chunk_size=1000000):
+    """Streams through the source bank of a statepoint or source.h5 file once and returns its AngularDistribution."""
+
+    distribution = AngularDistribution(n_mu, n_phi)
+    for chunk in iter_source_bank(filename, chunk_size):
+        distribution.add(np.column_stack([chunk['u']['x'], chunk['u']['y'], chunk['u']['z']]))
+    return distribution
+
+
+def plot_sky_map(distribution, title='Neutron initial directions'):
+    """Returns a plotly heatmap of the direction density relative to an isotropic source.
+
+    The axes are the azimuthal angle and cos(polar angle), an equal-area map of the sphere.
+    """
+
+    phi_centres = np.degrees(0.5 * (distribution.phi_bins[1:] + distribution.phi_bins[:-1]))
+    mu_centres = 0.5 * (distribution.mu_bins[1:] + distribution.mu_bins[:-1])
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(x=phi_centres,
+                             y=mu_centres,
+                             z=distribution.density() * 4. * np.pi,
+                             colorscale='Viridis',
+                             colorbar={'title': 'Relative to isotropic'}))
+    fig.update_layout(title=title + ' (' + str(distribution.count) + ' particles)',
+                      xaxis={'title': 'Azimuthal angle (degrees)'},
+                      yaxis={'title': 'Cosine of polar angle'})
+    return fig
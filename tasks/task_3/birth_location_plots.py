@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""birth_location_plots.py: plots neutron birth locations as a density volume or a fixed size point cloud."""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from source_bank import iter_source_bank
+
+
+def _chunks(source, chunk_size):
+    # a statepoint / source.h5 filename is read in chunks, an array (e.g. from source_sampler) is used directly
+    if isinstance(source, str):
+        return iter_source_bank(source, chunk_size)
+    return [source[start:start + chunk_size] for start in range(0, len(source), chunk_size)]
+
+
+def _positions(chunk):
+    return np.column_stack([chunk['r']['x'], chunk['r']['y'], chunk['r']['z']])
+
+
+def reservoir_sample(chunks, budget, seed=None):
+    """Keeps a uniform random sample of at most budget particles from a stream of chunks (algorithm R).
+
+    Raises a ValueError if there are no particles, as the fields of the sample are not known.
+    """
+
+    rng = np.random.default_rng(seed)
+    reservoir = None
+    seen = 0
+
+    for chunk in chunks:
+        if reservoir is None:
+            reservoir = np.empty(budget, dtype=chunk.dtype)
+
+        # the first particles fill the reservoir
+        filled = max(0, min(budget - seen, len(chunk)))
+        reservoir[seen:seen + filled] = chunk[:filled]
+
+        # later particles replace a random entry with probability budget / (index + 1)
+        indices = seen + np.arange(filled, len(chunk))
+        replace = (rng.random(len(indices)) * (indices + 1)).astype(np.int64)
+        mask = replace < budget
+        # numpy assigns repeated indices in order, so later particles win as in the sequential algorithm
+        reservoir[replace[mask]] = chunk[filled:][mask]
+
+        seen += len(chunk)
+
+    if reservoir is None or seen == 0:
+        raise ValueError('The source bank is empty, there are no particles to sample')
+    return reservoir[:min(seen, budget)]
+
+
+def birth_location_histogram(source, bins=40, chunk_size=1000000):
+    """Bins the birth locations into a 3D histogram, streaming through the source twice (bounds, then counts)."""
+
+    lower = np.full(3, np.inf)
+    upper = np.full(3, -np.inf)
+    for chunk in _chunks(source, chunk_size):
+        positions = _positions(chunk)
+        lower = np.minimum(lower, positions.min(axis=0))
+        upper = np.maximum(upper, positions.max(axis=0))
+
+    # a point source has no extent so the bins are widened slightly
+    padding = np.maximum(1e-6, 1e-6 * np.abs(upper))
+    edges = [np.linspace(low - pad, up + pad, bins + 1) for low, up, pad in zip(lower, upper, padding)]
+
+    counts = np.zeros((bins, bins, bins))
+    for chunk in _chunks(source, chunk_size):
+        chunk_counts, _ = np.histogramdd(_positions(chunk), bins=edges)
+        counts += chunk_counts
+
+    return counts, edges
+
+
+def plot_birth_locations(source, mode='points', bins=40, budget=10000, marker_size=2, seed=None, chunk_size=1000000):
+    """Returns a plotly figure of the birth locations in a source bank, statepoint filename or sampled array.
+
+    mode='volume' renders a 3D histogram of the births, so the file size only depends on bins.
+    mode='points' renders at most budget randomly selected births coloured by energy.
+    """
+
+    fig = go.Figure()
+
+    if mode == 'volume':
+        counts, edges = birth_location_histogram(source, bins, chunk_size)
+        centres = [0.5 * (edge[1:] + edge[:-1]) for edge in edges]
+        x, y, z = np.meshgrid(*centres, indexing='ij')
+        fig.add_trace(go.Volume(x=x.ravel(),
+                                y=y.ravel(),
+                                z=z.ravel(),
+                                value=counts.ravel(),
+                                isomin=counts.max() * 0.05,
+                                isomax=counts.max(),
+                                opacity=0.1,
+                                surface_count=15,
+                                colorbar={'title': 'Births per bin'}))
+        fig.update_layout(title='Neutron production density')
+
+    elif mode == 'points':
+        samples = reservoir_sample(_chunks(source, chunk_size), budget, seed)
+        fig.add_trace(go.Scatter3d(x=samples['r']['x'],
+                                   y=samples['r']['y'],
+                                   z=samples['r']['z'],
+                                   hovertemplate='Energy = %{marker.color} eV',
+                                   mode='markers',
+                                   marker={'size': marker_size,
+                                           'color': samples['E'],
+                                   }
+                    )
+                  )
+        fig.update_layout(title='Neutron production coordinates, coloured by energy')
+
+    else:
+        raise ValueError('mode must be either points or volume, not ' + str(mode))
+
+    return fig
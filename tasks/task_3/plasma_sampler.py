@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""plasma_sampler.py: numpy version of the parametric plasma neutron source for visualisation and source studies.
+
+The source follows the model of C. Fausser et al, Tokamak D-T neutron source
+models for different plasma physics confinement modes, Fus. Eng. Des. (2012)
+which is also used by the compiled parametric_plasma_source library.
+"""
+
+import inspect
+
+import numpy as np
+
+from source_sampler import SOURCE_DTYPE
+
+
+def dt_reactivity(ion_temperature):
+    """Bosch-Hale D-T fusion reactivity (m3/s) for ion temperatures in keV."""
+
+    t = np.asarray(ion_temperature, dtype=float)
+    bg = 34.3827
+    mrc2 = 1124656.
+    c1, c2, c3, c4, c5, c6, c7 = 1.17302e-9, 1.51361e-2, 7.51886e-2, 4.60643e-3, 1.35e-2, -1.0675e-4, 1.366e-5
+
+    theta = t / (1. - (t * (c2 + t * (c4 + t * c6))) / (1. + t * (c3 + t * (c5 + t * c7))))
+    xi = (bg**2 / (4. * theta))**(1. / 3.)
+    return c1 * theta * np.sqrt(xi / (mrc2 * t**3)) * np.exp(-3. * xi) * 1e-6
+
+
+def make_alias_table(probabilities):
+    """Walker / Vose alias table for sampling a discrete distribution in constant time per sample."""
+
+    n = len(probabilities)
+    scaled = np.asarray(probabilities, dtype=float) * n
+    alias_probabilities = np.ones(n)
+    aliases = np.arange(n)
+
+    small = [i for i in range(n) if scaled[i] < 1.]
+    large = [i for i in range(n) if scaled[i] >= 1.]
+    while small and large:
+        i = small.pop()
+        j = large.pop()
+        alias_probabilities[i] = scaled[i]
+        aliases[i] = j
+        scaled[j] -= 1. - scaled[i]
+        if scaled[j] < 1.:
+            small.append(j)
+        else:
+            large.append(j)
+
+    return alias_probabilities, aliases
+
+
+class NumpyPlasmaSource:
+    """Samples neutron births from a parametric tokamak plasma in batches.
+
+    Lengths are given in m and sampled positions are returned in cm as used by
+    OpenMC, temperatures are in keV and densities in particles per m3.
+    plasma_type is 1 for H-mode (pedestal profiles) and 0 for L-mode.
+    """
+
+    def __init__(self,
+                 major_radius=9.06,
+                 minor_radius=2.92258,
+                 elongation=1.557,
+                 triangularity=0.270,
+                 shafranov_shift=0.44789,
+                 plasma_type=1,
+                 ion_density_origin=1.09e20,
+                 ion_density_pedestal=1.09e20,
+                 ion_density_separatrix=3e19,
+                 ion_density_peaking_factor=1.,
+                 ion_temperature_origin=45.9,
+                 ion_temperature_pedestal=6.09,
+                 ion_temperature_separatrix=0.1,
+                 ion_temperature_peaking_factor=8.06,
+                 ion_temperature_beta=6.,
+                 pedestal_radius=None,
+                 number_of_bins=100,
+                 min_toroidal_angle=0.,
+                 max_toroidal_angle=360.):
+
+        self.major_radius = major_radius
+        self.minor_radius = minor_radius
+        self.elongation = elongation
+        self.triangularity = triangularity
+        self.shafranov_shift = shafranov_shift
+        self.plasma_type = plasma_type
+        self.ion_density_origin = ion_density_origin
+        self.ion_density_pedestal = ion_density_pedestal
+        self.ion_density_separatrix = ion_density_separatrix
+        self.ion_density_peaking_factor = ion_density_peaking_factor
+        self.ion_temperature_origin = ion_temperature_origin
+        self.ion_temperature_pedestal = ion_temperature_pedestal
+        self.ion_temperature_separatrix = ion_temperature_separatrix
+        self.ion_temperature_peaking_factor = ion_temperature_peaking_factor
+        self.ion_temperature_beta = ion_temperature_beta
+        self.pedestal_radius = 0.8 * minor_radius if pedestal_radius is None else pedestal_radius
+        self.number_of_bins = number_of_bins
+        self.min_toroidal_angle = min_toroidal_angle
+        self.max_toroidal_angle = max_toroidal_angle
+
+        # the emission of each radial bin is found once and sampled from many times
+        self.bin_edges = np.linspace(0., minor_radius, number_of_bins + 1)
+        bin_centres = 0.5 * (self.bin_edges[1:] + self.bin_edges[:-1])
+        emission = (0.5 * self.ion_density(bin_centres))**2 * dt_reactivity(self.ion_temperature(bin_centres)) * bin_centres
+        self.bin_probabilities = emission / emission.sum()
+        self.alias_probabilities, self.aliases = make_alias_table(self.bin_probabilities)
+
+        # Muir (Gaussian) D-T spectrum width for the ion temperature of each bin, as openmc.stats.Muir(m_rat=5)
+        self.bin_energy_std_dev = np.sqrt(2. * 14.08e6 * 1000. * self.ion_temperature(bin_centres) / 5.)
+
+    @classmethod
+    def from_plasma(cls, plasma):
+        """Makes a sampler with the parameters of a parametric_plasma_source.Plasma object."""
+
+        parameter_names = inspect.signature(cls).parameters
+        parameters = {}
+        for name, value in vars(plasma).items():
+            name = name.replace('pedistal', 'pedestal')
+            if name in parameter_names:
+                parameters[name] = value
+        return cls(**parameters)
+
+    def ion_density(self, r):
+        r = np.asarray(r, dtype=float)
+        if self.plasma_type == 0:
+            return self.ion_density_origin * (1. - (r / self.minor_radius)**2)**self.ion_density_peaking_factor
+
+        core = (self.ion_density_pedestal + (self.ion_density_origin - self.ion_density_pedestal) *
+                np.clip(1. - (r / self.pedestal_radius)**2, 0., None)**self.ion_density_peaking_factor)
+        edge = (self.ion_density_separatrix + (self.ion_density_pedestal - self.ion_density_separatrix) *
+                (self.minor_radius - r) / (self.minor_radius - self.pedestal_radius))
+        return np.where(r <= self.pedestal_radius, core, edge)
+
+    def ion_temperature(self, r):
+        r = np.asarray(r, dtype=float)
+        if self.plasma_type == 0:
+            return self.ion_temperature_origin * (1. - (r / self.minor_radius)**2)**self.ion_temperature_peaking_factor
+
+        core = (self.ion_temperature_pedestal + (self.ion_temperature_origin - self.ion_temperature_pedestal) *
+                np.clip(1. - (r / self.pedestal_radius)**self.ion_temperature_beta, 0., None)**self.ion_temperature_peaking_factor)
+        edge = (self.ion_temperature_separatrix + (self.ion_temperature_pedestal - self.ion_temperature_separatrix) *
+                (self.minor_radius - r) / (self.minor_radius - self.pedestal_radius))
+        return np.where(r <= self.pedestal_radius, core, edge)
+
+    def sample(self, n_samples, seed=None, rng=None):
+        """Returns n_samples neutron births with the r, u, E and wgt fields of the OpenMC source bank."""
+
+        if rng is None:
+            rng = np.random.default_rng(seed)
+
+        # minor radius bin from the emission of each bin using the alias method, which avoids a search per sample
+        scaled = rng.random(n_samples) * self.number_of_bins
+        bins = scaled.astype(np.intp)
+        bins = np.where(scaled - bins < self.alias_probabilities[bins], bins, self.aliases[bins])
+        # uniform within the bin
+        r = self.bin_edges[bins] + rng.random(n_samples) * (self.minor_radius / self.number_of_bins)
+
+        # position in the shaped poloidal cross section, including the Shafranov shift
+        alpha = 2. * np.pi * rng.random(n_samples)
+        major = (self.major_radius + r * np.cos(alpha + self.triangularity * np.sin(alpha)) +
+                 self.shafranov_shift * (1. - (r / self.minor_radius)**2))
+        toroidal_angle = np.radians(self.min_toroidal_angle +
+                                    (self.max_toroidal_angle - self.min_toroidal_angle) * rng.random(n_samples))
+
+        samples = np.empty(n_samples, dtype=SOURCE_DTYPE)
+        samples['r']['x'] = 100. * major * np.cos(toroidal_angle)
+        samples['r']['y'] = 100. * major * np.sin(toroidal_angle)
+        samples['r']['z'] = 100. * self.elongation * r * np.sin(alpha)
+
+        mu = 2. * rng.random(n_samples) - 1.
+        phi = 2. * np.pi * rng.random(n_samples)
+        sin_theta = np.sqrt(1. - mu**2)
+        samples['u']['x'] = sin_theta * np.cos(phi)
+        samples['u']['y'] = sin_theta * np.sin(phi)
+        samples['u']['z'] = mu
+
+        samples['E'] = 14.08e6 + rng.standard_normal(n_samples) * self.bin_energy_std_dev[bins]
+        samples['wgt'] = 1.
+
+        return samples
+
+
+def ks_statistic(samples_1, samples_2):
+    """Two sample Kolmogorov-Smirnov statistic, the largest difference between the two empirical CDFs."""
+
+    samples_1 = np.sort(np.asarray(samples_1, dtype=float))
+    samples_2 = np.sort(np.asarray(samples_2, dtype=float))
+    values = np.concatenate([samples_1, samples_2])
+    cdf_1 = np.searchsorted(samples_1, values, side='right') / len(samples_1)
+    cdf_2 = np.searchsorted(samples_2, values, side='right') / len(samples_2)
+    return np.abs(cdf_1 - cdf_2).max()
+
+
+def compare_with_source_bank(samples, source_bank):
+    """Compares numpy samples with a source bank from the compiled source (e.g. openmc.StatePoint(...).source).
+
+    Returns the KS statistic and the 99% critical value for the major radius, height,
+    direction and energy. Statistics below the critical value show the samples agree.
+    """
+
+    def major_radius(bank):
+        return np.sqrt(bank['r']['x']**2 + bank['r']['y']**2)
+
+    quantities = {'major radius': major_radius,
+                  'height': lambda bank: bank['r']['z'],
+                  'direction z': lambda bank: bank['u']['z'],
+                  'energy': lambda bank: bank['E']}
+
+    critical_value = 1.628 * np.sqrt((len(samples) + len(source_bank)) / (len(samples) * len(source_bank)))
+
+    return {name: (ks_statistic(quantity(samples), quantity(source_bank)), critical_value)
+            for name, quantity in quantities.items()}
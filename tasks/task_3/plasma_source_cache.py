@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""plasma_source_cache.py: compiles each parametric plasma source library once and reuses it from a shared cache."""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import openmc
+import parametric_plasma_source
+
+
+def get_cache_directory():
+    return os.environ.get('OPENMC_WORKSHOP_SOURCE_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'openmc_workshop', 'plasma_sources'))
+
+
+def get_toolchain_description():
+    # a different compiler, OpenMC or plasma source package needs a new library
+    compiler = os.environ.get('CXX', 'g++')
+    try:
+        compiler_version = subprocess.run([compiler, '--version'], stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT, universal_newlines=True).stdout
+    except FileNotFoundError:
+        compiler_version = compiler + ' not found'
+
+    return {'compiler': compiler_version,
+            'openmc': openmc.__version__,
+            'parametric_plasma_source': getattr(parametric_plasma_source, '__version__', parametric_plasma_source.__file__)}
+
+
+def get_cache_key(plasma):
+    plasma_parameters = {name: repr(value) for name, value in sorted(vars(plasma).items())}
+    description = json.dumps({'plasma': plasma_parameters, 'toolchain': get_toolchain_description()}, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def get_plasma_source_library(plasma, cache_directory=None):
+    """Returns the path of the compiled source library for the plasma, compiling it only if it is not in the cache.
+
+    Libraries are built in a temporary directory and moved into the cache in one
+    step, and a lock file stops parallel runs compiling the same library twice.
+    """
+
+    if cache_directory is None:
+        cache_directory = get_cache_directory()
+
+    key = get_cache_key(plasma)
+    library_filename = os.path.join(cache_directory, key + '.so')
+    if os.path.exists(library_filename):
+        return library_filename
+
+    os.makedirs(cache_directory, exist_ok=True)
+    with open(os.path.join(cache_directory, key + '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        # another process may have finished compiling while this one waited for the lock
+        if not os.path.exists(library_filename):
+            build_directory = tempfile.mkdtemp(dir=cache_directory)
+            try:
+                build_filename = os.path.join(build_directory, 'plasma_source.so')
+                plasma.export_plasma_source(build_filename)
+                if not os.path.exists(build_filename):
+                    raise RuntimeError('Compiling the plasma source library failed')
+                os.replace(build_filename, library_filename)
+            finally:
+                shutil.rmtree(build_directory, ignore_errors=True)
+
+    return library_filename
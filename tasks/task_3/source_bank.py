@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""source_bank.py: reads statepoint or source.h5 source banks in chunks with streaming histograms and moments."""
+
+import h5py
+import numpy as np
+
+
+def iter_source_bank(filename, chunk_size=1000000):
+    """Yields the source bank of a statepoint or source.h5 file as structured numpy arrays of chunk_size particles.
+
+    Each chunk is read as a separate hyperslab so the full bank is never held in memory.
+    """
+
+    with h5py.File(filename, 'r') as f:
+        source_bank = f['source_bank']
+        for start in range(0, source_bank.shape[0], chunk_size):
+            yield source_bank[start:start + chunk_size]
+
+
+def read_source_particles(filename, n_particles):
+    """Returns the first n_particles of the source bank of a statepoint or source.h5 file, reading only those."""
+
+    with h5py.File(filename, 'r') as f:
+        return f['source_bank'][:n_particles]
+
+
+class StreamingHistogram:
+    """Histogram that is filled chunk by chunk."""
+
+    def __init__(self, bins):
+        self.bins = np.asarray(bins, dtype=float)
+        self.counts = np.zeros(len(self.bins) - 1)
+
+    def add(self, values, weights=None):
+        counts, _ = np.histogram(values, self.bins, weights=weights)
+        self.counts += counts
+
+    def probability(self):
+        # fraction of the particles in each bin, the same as np.histogram(density=True) * bin widths
+        return self.counts / self.counts.sum()
+
+
+class StreamingMoments:
+    """Count, mean and variance of one or more quantities, combined chunk by chunk (Chan et al.)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.sum_of_squares = 0.
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        chunk_count = len(values)
+        chunk_mean = values.mean(axis=0)
+        chunk_sum_of_squares = ((values - chunk_mean)**2).sum(axis=0)
+
+        total_count = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean = self.mean + delta * chunk_count / total_count
+        self.sum_of_squares = self.sum_of_squares + chunk_sum_of_squares + delta**2 * self.count * chunk_count / total_count
+        self.count = total_count
+
+    @property
+    def variance(self):
+        return self.sum_of_squares / (self.count - 1)
+
+    @property
+    def std_dev(self):
+        return np.sqrt(self.variance)
+
+
+def _xyz(values):
+    # converts the r or u compound field of a chunk into an (n, 3) array
+    return np.column_stack([values['x'], values['y'], values['z']])
+
+
+def summarise_source_bank(filename, energy_bins, position_bins=None, direction_bins=None, chunk_size=1000000):
+    """Streams through a source bank once, returning histograms and moments of energy, position and direction.
+
+    position_bins and direction_bins are optional bin edges used for each of the x, y and z components.
+    """
+
+    summary = {'energy_histogram': StreamingHistogram(energy_bins),
+               'energy_moments': StreamingMoments(),
+               'position_moments': StreamingMoments(),
+               'direction_moments': StreamingMoments()}
+    if position_bins is not None:
+        summary['position_histograms'] = [StreamingHistogram(position_bins) for axis in 'xyz']
+    if direction_bins is not None:
+        summary['direction_histograms'] = [StreamingHistogram(direction_bins) for axis in 'xyz']
+
+    for chunk in iter_source_bank(filename, chunk_size):
+        positions = _xyz(chunk['r'])
+        directions = _xyz(chunk['u'])
+
+        summary['energy_histogram'].add(chunk['E'])
+        summary['energy_moments'].add(chunk['E'])
+        summary['position_moments'].add(positions)
+        summary['direction_moments'].add(directions)
+
+        for histogram, axis in zip(summary.get('position_histograms', []), range(3)):
+            histogram.add(positions[:, axis])
+        for histogram, axis in zip(summary.get('direction_histograms', []), range(3)):
+            histogram.add(directions[:, axis])
+
+    return summary
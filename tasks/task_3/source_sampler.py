@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""source_sampler.py: samples openmc.Source distributions with numpy, without running OpenMC."""
+
+import numpy as np
+import openmc
+import openmc.stats
+
+
+# the same fields as the OpenMC source bank so the samples can be plotted with the statepoint plotting code
+SOURCE_DTYPE = np.dtype([('r', [('x', float), ('y', float), ('z', float)]),
+                         ('u', [('x', float), ('y', float), ('z', float)]),
+                         ('E', float),
+                         ('wgt', float)])
+
+
+def sample_space(space, n_samples, rng):
+    if isinstance(space, openmc.stats.Point):
+        return np.tile(np.asarray(space.xyz, dtype=float), (n_samples, 1))
+    raise TypeError('unsupported distribution: sampling of ' + type(space).__name__ + ' spatial distributions is not supported')
+
+
+def sample_angle(angle, n_samples, rng):
+    if angle is None or isinstance(angle, openmc.stats.Isotropic):
+        mu = 2. * rng.random(n_samples) - 1.
+        phi = 2. * np.pi * rng.random(n_samples)
+        sin_theta = np.sqrt(1. - mu**2)
+        return np.column_stack([sin_theta * np.cos(phi), sin_theta * np.sin(phi), mu])
+    if isinstance(angle, openmc.stats.Monodirectional):
+        return np.tile(np.asarray(angle.reference_uvw, dtype=float), (n_samples, 1))
+    raise TypeError('unsupported distribution: sampling of ' + type(angle).__name__ + ' angular distributions is not supported')
+
+
+def _sample_maxwell(theta, n_samples, rng):
+    # the same algorithm as OpenMC (rule C64 of the Monte Carlo sampler)
+    r1, r2, r3 = rng.random((3, n_samples))
+    return -theta * (np.log(r1) + np.log(r2) * np.cos(np.pi / 2. * r3)**2)
+
+
+def sample_energy(energy, n_samples, rng):
+    if isinstance(energy, openmc.stats.Discrete):
+        probabilities = np.asarray(energy.p, dtype=float)
+        return rng.choice(np.asarray(energy.x, dtype=float), size=n_samples, p=probabilities / probabilities.sum())
+    if isinstance(energy, openmc.stats.Muir):
+        # Gaussian with the width of a D-T (or other) fusion plasma at temperature kt
+        return rng.normal(energy.e0, np.sqrt(2. * energy.e0 * energy.kt / energy.m_rat), n_samples)
+    if isinstance(energy, openmc.stats.Maxwell):
+        return _sample_maxwell(energy.theta, n_samples, rng)
+    if energy is None or isinstance(energy, openmc.stats.Watt):
+        # OpenMC uses a U-235 like Watt spectrum if no energy distribution is set
+        a, b = (0.988e6, 2.249e-6) if energy is None else (energy.a, energy.b)
+        w = _sample_maxwell(a, n_samples, rng)
+        return w + a**2 * b / 4. + (2. * rng.random(n_samples) - 1.) * np.sqrt(a**2 * b * w)
+    raise TypeError('unsupported distribution: sampling of ' + type(energy).__name__ + ' energy distributions is not supported')
+
+
+def sample_source(source, n_samples, seed=None):
+    """Draws n_samples birth positions, directions and energies from an openmc.Source.
+
+    Returns a structured array with the r, u, E and wgt fields of the OpenMC source bank.
+    Point spatial, Isotropic and Monodirectional angular and Discrete, Muir, Maxwell
+    and Watt energy distributions are supported.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    samples = np.empty(n_samples, dtype=SOURCE_DTYPE)
+    for field, values in [('r', sample_space(source.space, n_samples, rng)),
+                          ('u', sample_angle(source.angle, n_samples, rng))]:
+        samples[field]['x'] = values[:, 0]
+        samples[field]['y'] = values[:, 1]
+        samples[field]['z'] = values[:, 2]
+    samples['E'] = sample_energy(source.energy, n_samples, rng)
+    samples['wgt'] = 1.
+
+    return samples
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""track_converter.py: converts many OpenMC track files into a single VTK PolyData file in one process."""
+
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+import numpy as np
+
+
+def parse_track_filename(filename):
+    """Returns the batch, generation and particle numbers from a track_<batch>_<generation>_<particle>.h5 filename."""
+
+    match = re.search(r'track_(\d+)_(\d+)_(\d+)\.h5$', os.path.basename(filename))
+    if match is None:
+        raise ValueError(filename + ' is not named like an OpenMC track file (track_<batch>_<generation>_<particle>.h5)')
+    return tuple(int(number) for number in match.groups())
+
+
+def read_track_file(filename):
+    """Reads every track in one track file.
+
+    Returns the coordinates of all tracks stacked into one (n, 3) array, the
+    number of coordinates in each track and the energy at the start of each
+    track. Track files that only store coordinates give an energy of nan.
+    """
+
+    batch, generation, particle = parse_track_filename(filename)
+
+    coordinates = []
+    energies = []
+    with h5py.File(filename, 'r') as f:
+        n_particles = int(f.attrs['n_particles'])
+        for i in range(n_particles):
+            track = f['coordinates_' + str(i + 1)][()]
+            if track.dtype.names is not None and 'r' in track.dtype.names:
+                # newer track files store the full particle state at each step
+                energies.append(track['E'][0] if 'E' in track.dtype.names else np.nan)
+                track = np.column_stack([track['r']['x'], track['r']['y'], track['r']['z']])
+            else:
+                energies.append(np.nan)
+            coordinates.append(np.asarray(track, dtype=float).reshape(-1, 3))
+
+    return {'coordinates': np.concatenate(coordinates) if coordinates else np.empty((0, 3)),
+            'n_coords': np.array([len(track) for track in coordinates], dtype=np.int64),
+            'energy': np.array(energies, dtype=float),
+            'particle': np.full(len(coordinates), particle, dtype=np.int64),
+            'generation': np.full(len(coordinates), generation, dtype=np.int64),
+            'batch': np.full(len(coordinates), batch, dtype=np.int64)}
+
+
+def read_track_files(filenames, max_workers=None):
+    """Reads track files in parallel worker processes and merges them, keeping the order of filenames."""
+
+    filenames = list(filenames)
+    if len(filenames) == 0:
+        raise ValueError('No track files to read')
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    # sending several files to each worker at a time keeps the inter process overhead small
+    chunksize = max(1, len(filenames) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        tracks = list(executor.map(read_track_file, filenames, chunksize=chunksize))
+
+    return {key: np.concatenate([track[key] for track in tracks]) for key in tracks[0]}
+
+
+def write_tracks_vtp(tracks, filename):
+    """Writes the tracks as poly lines in one .vtp file with the particle, generation, batch and energy as cell data."""
+
+    try:
+        import vtk
+        from vtk.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray
+    except (ImportError, ModuleNotFoundError):
+        msg = "Conversion to VTK requested," \
+              "but the Python VTK module is not installed."
+        raise ImportError(msg)
+
+    n_coords = tracks['n_coords']
+    n_tracks = len(n_coords)
+
+    points = vtk.vtkPoints()
+    points.SetData(numpy_to_vtk(np.ascontiguousarray(tracks['coordinates'], dtype=float), deep=True))
+
+    # the legacy cell layout is the number of points in each line followed by their point ids
+    offsets = np.concatenate([[0], np.cumsum(n_coords)[:-1]])
+    cell_layout = np.empty(n_tracks + n_coords.sum(), dtype=np.int64)
+    starts = offsets + np.arange(n_tracks)
+    cell_layout[starts] = n_coords
+    point_ids = np.ones(len(cell_layout), dtype=bool)
+    point_ids[starts] = False
+    cell_layout[point_ids] = np.arange(n_coords.sum())
+
+    lines = vtk.vtkCellArray()
+    lines.SetCells(n_tracks, numpy_to_vtkIdTypeArray(cell_layout, deep=True))
+
+    poly_data = vtk.vtkPolyData()
+    poly_data.SetPoints(points)
+    poly_data.SetLines(lines)
+
+    for name in ['particle', 'generation', 'batch', 'energy']:
+        array = numpy_to_vtk(np.ascontiguousarray(tracks[name]), deep=True)
+        array.SetName(name)
+        poly_data.GetCellData().AddArray(array)
+
+    writer = vtk.vtkXMLPolyDataWriter()
+    writer.SetFileName(filename)
+    writer.SetInputData(poly_data)
+    writer.SetDataModeToAppended()
+    writer.SetCompressorTypeToZLib()
+
+    print('Writing %s' % filename)
+
+    writer.Write()
+
+
+def convert_tracks(pattern='track_*.h5', output='tracks.vtp', max_workers=None):
+    """Converts all the track files matching pattern into one .vtp file and returns the number of tracks."""
+
+    filenames = sorted(glob.glob(pattern), key=parse_track_filename)
+    tracks = read_track_files(filenames, max_workers)
+    write_tracks_vtp(tracks, output)
+    return len(tracks['n_coords'])
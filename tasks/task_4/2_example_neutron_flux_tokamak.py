@@ -5,6 +5,9 @@
 
 import openmc
 import os
+import numpy as np
+
+from mesh_tally_cache import open_cache
 
 # MATERIALS
 
@@ -103,10 +106,31 @@ mesh_tally.scores = ['(n,Xt)']  # this can be changed to 'absorption' to show th
 tallies.append(mesh_tally)
 
 
+# The same tally on a cylindrical mesh, which follows the shape of the tokamak so fewer bins are needed
+cylindrical_mesh = openmc.CylindricalMesh()
+cylindrical_mesh.r_grid = np.linspace(0, 750, 51)
+cylindrical_mesh.phi_grid = np.linspace(0, 2 * np.pi, 37)
+cylindrical_mesh.z_grid = np.linspace(-750, 750, 101)
+
+cylindrical_mesh_tally = openmc.Tally(name='tally_on_cylindrical_mesh')
+cylindrical_mesh_tally.filters = [openmc.MeshFilter(cylindrical_mesh)]
+cylindrical_mesh_tally.scores = ['(n,Xt)']
+tallies.append(cylindrical_mesh_tally)
+
+
 # Run OpenMC!
 model = openmc.model.Model(geom, mats, sett, tallies)
 sp_filename = model.run()
 
 os.system('python openmc-statepoint-3d.py -i '+str(sp_filename)+' -t 1 -n tally_on_mesh -m 1 -o tally_on_mesh.vtk')
+os.system('python openmc-statepoint-3d.py -i '+str(sp_filename)+' -t '+str(cylindrical_mesh_tally.id)+' -n tally_on_cylindrical_mesh -m '+str(cylindrical_mesh.id)+' -o tally_on_cylindrical_mesh.vtk')
+
+# quick look at the tritium production without paraview, the results are cached so later looks do not reload the statepoint
+tally_view = open_cache(sp_filename, [mesh_tally.id]).view(mesh_tally.id)
+tally_view.plot_slice('z', 0., 'tally_on_mesh_xy.png')
+tally_view.plot_slice('y', 150., 'tally_on_mesh_xz.png')
+tally_view.plot_profile('x', (0., 150., 0.), 'tally_on_mesh_profile.png')
+total, total_std_dev = tally_view.integrate()
+print('Total tritium production', total, '+/-', total_std_dev, 'per source neutron')
 os.system('cp tally_on_mesh.vtk /my_openmc_workshop')
 os.system('paraview tally_on_mesh.vtk')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""3_example_weight_windows_tokamak.py: uses weight windows to get the neutron flux deep into the tokamak blanket and vessel."""
+
+
+import json
+
+import openmc
+import numpy as np
+
+from weight_windows import add_flux_tally, generate_weight_windows, read_flux, report_fom_gain
+
+# MATERIALS
+
+breeder_material = openmc.Material(1, "PbLi")   # Pb84.2Li15.8
+breeder_material.add_element('Pb', 84.2, percent_type='ao')
+breeder_material.add_element('Li', 15.8, percent_type='ao', enrichment=7.0, enrichment_target='Li6', enrichment_type='ao')   # natural enrichment = 7% Li6
+breeder_material.set_density('atom/b-cm', 3.2720171e-2)   # around 11 g/cm3
+
+copper = openmc.Material(name='Copper')
+copper.set_density('g/cm3', 8.5)
+copper.add_element('Cu', 1.0)
+
+eurofer = openmc.Material(name='EUROFER97')
+eurofer.set_density('g/cm3', 7.75)
+eurofer.add_element('Fe', 89.067, percent_type='wo')
+eurofer.add_element('C', 0.11, percent_type='wo')
+eurofer.add_element('Mn', 0.4, percent_type='wo')
+eurofer.add_element('Cr', 9.0, percent_type='wo')
+eurofer.add_element('Ta', 0.12, percent_type='wo')
+eurofer.add_element('W', 1.1, percent_type='wo')
+eurofer.add_element('N', 0.003, percent_type='wo')
+eurofer.add_element('V', 0.2, percent_type='wo')
+
+mats = openmc.Materials([breeder_material, eurofer, copper])
+
+
+# GEOMETRY
+
+# surfaces
+central_sol_surface = openmc.ZCylinder(r=100)
+central_shield_outer_surface = openmc.ZCylinder(r=110)
+vessel_inner_surface = openmc.Sphere(r=500)
+first_wall_outer_surface = openmc.Sphere(r=510)
+breeder_blanket_outer_surface = openmc.Sphere(r=610, boundary_type='vacuum')
+
+# cells
+central_sol_region = -central_sol_surface & -breeder_blanket_outer_surface
+central_sol_cell = openmc.Cell(region=central_sol_region)
+central_sol_cell.fill = copper
+
+central_shield_region = +central_sol_surface & -central_shield_outer_surface & -breeder_blanket_outer_surface
+central_shield_cell = openmc.Cell(region=central_shield_region)
+central_shield_cell.fill = eurofer
+
+inner_vessel_region = -vessel_inner_surface & +central_shield_outer_surface
+inner_vessel_cell = openmc.Cell(region=inner_vessel_region)
+# no material set as default is vacuum
+
+first_wall_region = -first_wall_outer_surface & +vessel_inner_surface
+first_wall_cell = openmc.Cell(region=first_wall_region)
+first_wall_cell.fill = eurofer
+
+breeder_blanket_region = +first_wall_outer_surface & -breeder_blanket_outer_surface & +central_shield_outer_surface
+breeder_blanket_cell = openmc.Cell(region=breeder_blanket_region)
+breeder_blanket_cell.fill = breeder_material
+
+universe = openmc.Universe(cells=[central_sol_cell, central_shield_cell, inner_vessel_cell, first_wall_cell, breeder_blanket_cell])
+geom = openmc.Geometry(universe)
+
+
+# SIMULATION SETTINGS
+
+# Instantiate a Settings object
+sett = openmc.Settings()
+batches = 10
+sett.batches = batches
+sett.inactive = 0
+sett.particles = 5000
+sett.run_mode = 'fixed source'
+
+# Create a DT point source
+source = openmc.Source()
+source.angle = openmc.stats.Isotropic()
+source.energy = openmc.stats.Discrete([14e6], [1])
+source.space = openmc.stats.Point((150, 150, 0))
+
+sett.source = source
+
+# Create 3d mesh which is used for the weight windows and the flux tally
+mesh = openmc.RegularMesh()
+mesh.dimension = [50, 25, 50]  # width, depth, height
+mesh.lower_left = [-750, 0, -750]  # x,y,z coordinates
+mesh.upper_right = [750, 750, 750]  # x,y,z coordinates
+
+tallies = openmc.Tallies()
+
+model = openmc.model.Model(geom, mats, sett, tallies)
+add_flux_tally(model, mesh)
+
+# Run OpenMC without weight windows, with the same particles and batches, as the reference for the figure of merit
+analog_result = read_flux(model.run())
+
+# Cheap runs make weight windows from the flux, each run reaching deeper than the last
+weight_windows, flux_results = generate_weight_windows(model, mesh, iterations=2, particles=1000, batches=10)
+
+# Run OpenMC with the weight windows!
+sp_filename = model.run()
+
+summary = report_fom_gain(analog_result, read_flux(sp_filename),
+                          coordinates=[np.linspace(low, high, n + 1) for low, high, n in
+                                       zip(mesh.lower_left, mesh.upper_right, mesh.dimension)],
+                          output='fom_gain.vtr')
+
+with open('3_example_weight_windows_tokamak_results.json', 'w') as file_object:
+    json.dump(summary, file_object, indent=2)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""mesh_tallies.py: reads mesh tally results from OpenMC statepoints as numpy arrays in mesh order."""
+
+from collections import OrderedDict
+
+import numpy as np
+import openmc
+
+
+def get_mesh_filter(tally, mesh_id=None):
+    """Returns the MeshFilter of the tally, optionally checking it is on the mesh with mesh_id."""
+
+    for tally_filter in tally.filters:
+        if isinstance(tally_filter, openmc.MeshFilter):
+            if mesh_id is not None and tally_filter.mesh.id != mesh_id:
+                raise ValueError('Tally {} is not on mesh {}'.format(tally.id, mesh_id))
+            return tally_filter
+    raise ValueError('Tally {} does not have a mesh filter'.format(tally.id))
+
+
+def mesh_grids(mesh):
+    """Returns the type, vertex grids (in mesh order) and origin of a regular, cylindrical or spherical mesh."""
+
+    origin = getattr(mesh, 'origin', (0., 0., 0.))
+    if isinstance(mesh, openmc.RegularMesh):
+        grids = [np.linspace(low, high, n + 1) for low, high, n in zip(mesh.lower_left, mesh.upper_right, mesh.dimension)]
+        return 'regular', grids, (0., 0., 0.)
+    if isinstance(mesh, getattr(openmc, 'CylindricalMesh', ())):
+        return 'cylindrical', [np.asarray(mesh.r_grid), np.asarray(mesh.phi_grid), np.asarray(mesh.z_grid)], origin
+    if isinstance(mesh, getattr(openmc, 'SphericalMesh', ())):
+        return 'spherical', [np.asarray(mesh.r_grid), np.asarray(mesh.theta_grid), np.asarray(mesh.phi_grid)], origin
+    raise TypeError('{} meshes are not supported'.format(type(mesh).__name__))
+
+
+def mesh_points(mesh_type, grids, origin=(0., 0., 0.)):
+    """Returns the cartesian positions of the mesh vertices as an (n3 + 1, n2 + 1, n1 + 1, 3) array.
+
+    grids are the vertex grids in mesh order, (x, y, z) for regular, (r, phi, z)
+    for cylindrical and (r, theta, phi) for spherical meshes, with angles in
+    radians. The first grid varies fastest, matching the order of the mesh bins.
+    """
+
+    third, second, first = np.meshgrid(grids[2], grids[1], grids[0], indexing='ij')
+    if mesh_type == 'regular':
+        x, y, z = first, second, third
+    elif mesh_type == 'cylindrical':
+        r, phi, z = first, second, third
+        x, y = r * np.cos(phi), r * np.sin(phi)
+    elif mesh_type == 'spherical':
+        r, theta, phi = first, second, third
+        x, y, z = r * np.sin(theta) * np.cos(phi), r * np.sin(theta) * np.sin(phi), r * np.cos(theta)
+    else:
+        raise ValueError('{} meshes are not supported'.format(mesh_type))
+    return np.stack([x, y, z], axis=-1) + np.asarray(origin, dtype=float)
+
+
+def relative_error(mean, std_dev):
+    """Returns std_dev / mean, with 0 where the mean is 0."""
+
+    mean = np.asarray(mean, dtype=float)
+    std_dev = np.asarray(std_dev, dtype=float)
+    error = np.zeros(np.broadcast(mean, std_dev).shape)
+    np.divide(std_dev, mean, out=error, where=mean != 0.)
+    return np.abs(error)
+
+
+def energy_bin_labels(energy_bins):
+    """Labels for the (low, high) energy bins of an energy filter."""
+
+    return ['{:g}-{:g}eV'.format(low, high) for low, high in energy_bins]
+
+
+def array_names(label, scores, nuclides, filter_bin_labels):
+    """Returns the array names for every filter bin, nuclide and score, in the order of the tally results.
+
+    filter_bin_labels holds a list of bin labels for each filter other than the
+    mesh filter. Parts of the name are only added when there is more than one
+    score, nuclide or filter bin to tell apart.
+    """
+
+    names = []
+    shape = [len(labels) for labels in filter_bin_labels] + [len(nuclides), len(scores)]
+    for index in np.ndindex(*shape):
+        *filter_bins, nuclide, score = index
+        name = [label]
+        if len(scores) > 1:
+            name.append(scores[score])
+        if len(nuclides) > 1:
+            name.append(nuclides[nuclide])
+        for labels, filter_bin in zip(filter_bin_labels, filter_bins):
+            if len(labels) > 1:
+                name.append(labels[filter_bin])
+        names.append('_'.join(str(part) for part in name))
+    return names
+
+
+def mesh_tally_arrays(tally, mesh_id=None, label=None):
+    """Returns the mean and std_dev of every score, nuclide and filter bin of a mesh tally.
+
+    The result is an ordered dictionary of array names to (mean, std_dev) pairs of
+    flat arrays in mesh order (x varies fastest), with nan values replaced by 0.
+    Array names are the label (the tally name or tally_<id>) followed by the score,
+    nuclide and filter bin when the tally has more than one of them.
+    """
+
+    mesh_filter = get_mesh_filter(tally, mesh_id)
+    if label is None:
+        label = tally.name if tally.name else 'tally_{}'.format(tally.id)
+
+    # the filter bins are stored with the last filter varying fastest
+    shape = [tally_filter.num_bins for tally_filter in tally.filters] + [len(tally.nuclides), len(tally.scores)]
+    mesh_axis = tally.filters.index(mesh_filter)
+    mean = np.moveaxis(np.nan_to_num(tally.mean.reshape(shape)), mesh_axis, -1)
+    std_dev = np.moveaxis(np.nan_to_num(tally.std_dev.reshape(shape)), mesh_axis, -1)
+
+    filter_bin_labels = []
+    for tally_filter in tally.filters:
+        if tally_filter is mesh_filter:
+            continue
+        if isinstance(tally_filter, openmc.EnergyFilter):
+            filter_bin_labels.append(energy_bin_labels(tally_filter.bins))
+        else:
+            filter_bin_labels.append(['{}{}'.format(tally_filter.short_name.lower(), i) for i in range(tally_filter.num_bins)])
+
+    names = array_names(label, tally.scores, tally.nuclides, filter_bin_labels)
+    indices = np.ndindex(*mean.shape[:-1])
+    return OrderedDict((name, (mean[index], std_dev[index])) for name, index in zip(names, indices))
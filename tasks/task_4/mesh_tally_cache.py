@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+"""mesh_tally_cache.py: stores mesh tally results as .npy files with a json index, so later analyses memory map only what they use.
+
+For example
+python mesh_tally_cache.py -i statepoint.2.h5 -t 1
+writes statepoint.2_cache/index.json and a mean and std_dev .npy file for each tally.
+"""
+
+import argparse
+import json
+import os
+
+import h5py
+import numpy as np
+
+from mesh_tally_vtk import chunk_statistics, mesh_coordinates, read_mesh_tally_info
+
+
+INDEX_FILENAME = 'index.json'
+
+
+def _json_mesh(mesh):
+    return {key: value.tolist() if isinstance(value, np.ndarray) else
+            [grid.tolist() for grid in value] if key == 'grids' else value
+            for key, value in mesh.items()}
+
+
+def _filter_labels(tally_filter):
+    if tally_filter['type'] == 'energy':
+        edges = np.ravel(tally_filter['bins'])
+        return [[float(low), float(high)] for low, high in zip(edges[:-1], edges[1:])]
+    return np.ravel(tally_filter['bins']).tolist()
+
+
+def _read_index(directory):
+    with open(os.path.join(directory, INDEX_FILENAME)) as index_file:
+        return json.load(index_file)
+
+
+def _is_current(index, statepoint_filename):
+    """Returns True if the index was written from this statepoint file since it was last changed."""
+
+    return (index['statepoint'] == os.path.abspath(statepoint_filename)
+            and index['statepoint_mtime'] >= os.path.getmtime(statepoint_filename))
+
+
+def write_cache(statepoint_filename, tally_ids, directory=None, chunk_size=2**20):
+    """Writes the mean and std_dev of mesh tallies to .npy files and their metadata to index.json in directory.
+
+    Each array has the shape (other filter bins..., nuclides, scores, nz, ny, nx),
+    so the values of one score on the mesh, or a few z planes of it, are stored
+    together. The results are read from the statepoint chunk_size mesh bins at a
+    time. directory defaults to <statepoint name>_cache. Tallies already cached
+    from the same statepoint are kept in the index. Returns the directory.
+    """
+
+    if directory is None:
+        directory = os.path.splitext(statepoint_filename)[0] + '_cache'
+    os.makedirs(directory, exist_ok=True)
+
+    index = {'statepoint': os.path.abspath(statepoint_filename),
+             'statepoint_mtime': os.path.getmtime(statepoint_filename),
+             'meshes': {},
+             'tallies': {}}
+    if os.path.exists(os.path.join(directory, INDEX_FILENAME)):
+        previous = _read_index(directory)
+        if _is_current(previous, statepoint_filename):
+            index['meshes'].update(previous['meshes'])
+            index['tallies'].update(previous['tallies'])
+
+    with h5py.File(statepoint_filename, 'r') as f:
+        for tally_id in tally_ids:
+            tally = read_mesh_tally_info(f, tally_id)
+            mesh = tally['mesh']
+            n_cells = int(np.prod(mesh['dimension']))
+            mesh_shape = tuple(reversed(mesh['dimension']))
+
+            filter_shape = [tally_filter['n_bins'] for tally_filter in tally['filters']]
+            other_axes = [axis for axis in range(len(filter_shape)) if axis != tally['mesh_axis']]
+            other_shape = [filter_shape[axis] for axis in other_axes]
+            shape = tuple(other_shape) + (len(tally['nuclides']), len(tally['scores'])) + mesh_shape
+
+            files = {name: 'tally_{}_{}.npy'.format(tally_id, name) for name in ('mean', 'std_dev')}
+            arrays = {name: np.lib.format.open_memmap(os.path.join(directory, filename), mode='w+',
+                                                      dtype=np.float64, shape=shape)
+                      for name, filename in files.items()}
+            # the same arrays with the nuclides and scores merged and the mesh flattened, as in the results
+            flat = {name: array.reshape(tuple(other_shape) + (-1, n_cells)) for name, array in arrays.items()}
+
+            results = f['tallies/tally {}/results'.format(tally_id)]
+            strides = [int(np.prod(filter_shape[axis + 1:])) for axis in range(len(filter_shape))]
+            mesh_stride = strides[tally['mesh_axis']]
+            for other_bins in np.ndindex(*other_shape):
+                base = sum(b * strides[axis] for b, axis in zip(other_bins, other_axes))
+                for start in range(0, n_cells, chunk_size):
+                    stop = min(start + chunk_size, n_cells)
+                    rows = slice(base + start * mesh_stride, base + (stop - 1) * mesh_stride + 1, mesh_stride)
+                    mean, std_dev, _ = chunk_statistics(results[rows, :, :], tally['n_realizations'])
+                    flat['mean'][other_bins + (slice(None), slice(start, stop))] = mean.T
+                    flat['std_dev'][other_bins + (slice(None), slice(start, stop))] = std_dev.T
+
+            for array in arrays.values():
+                array.flush()
+            del flat, arrays
+
+            index['meshes'][str(mesh['id'])] = _json_mesh(mesh)
+            index['tallies'][str(tally_id)] = {
+                'name': tally['name'],
+                'n_realizations': tally['n_realizations'],
+                'mesh': mesh['id'],
+                'filters': [{'type': tally['filters'][axis]['type'],
+                             'bins': _filter_labels(tally['filters'][axis])} for axis in other_axes],
+                'nuclides': tally['nuclides'],
+                'scores': tally['scores'],
+                'shape': list(shape),
+                'mean': files['mean'],
+                'std_dev': files['std_dev']}
+
+    # the index is replaced in one step, so a reader never sees a partly written file
+    index_filename = os.path.join(directory, INDEX_FILENAME)
+    with open(index_filename + '.tmp', 'w') as index_file:
+        json.dump(index, index_file, indent=2)
+    os.replace(index_filename + '.tmp', index_filename)
+
+    print('Writing %s' % directory)
+
+    return directory
+
+
+class MeshTallyCache:
+    """Memory mapped access to the mesh tallies written by write_cache.
+
+    Nothing but the index is read when the cache is opened. Values are read from
+    disk as they are used, so slicing out one score or a few planes of a large
+    mesh only reads those values.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = _read_index(directory)
+        self._arrays = {}
+
+    @property
+    def tally_ids(self):
+        return [int(tally_id) for tally_id in self.index['tallies']]
+
+    def tally(self, tally_id):
+        """Returns the index entry of a tally: its name, filters, nuclides, scores and array shape."""
+
+        return self.index['tallies'][str(tally_id)]
+
+    def mesh(self, tally_id):
+        """Returns the mesh of a tally as a dictionary, as from read_mesh."""
+
+        mesh = dict(self.index['meshes'][str(self.tally(tally_id)['mesh'])])
+        for key in ('lower_left', 'upper_right', 'origin'):
+            if key in mesh:
+                mesh[key] = np.asarray(mesh[key])
+        if 'grids' in mesh:
+            mesh['grids'] = [np.asarray(grid) for grid in mesh['grids']]
+        mesh['dimension'] = tuple(mesh['dimension'])
+        return mesh
+
+    def coordinates(self, tally_id):
+        """Returns the vertex coordinates of the tally mesh, as from mesh_coordinates."""
+
+        return mesh_coordinates(self.mesh(tally_id))
+
+    def _array(self, tally_id, name):
+        key = (tally_id, name)
+        if key not in self._arrays:
+            filename = os.path.join(self.directory, self.tally(tally_id)[name])
+            self._arrays[key] = np.load(filename, mmap_mode='r')
+        return self._arrays[key]
+
+    def _index(self, tally_id, score, nuclide, filter_bins):
+        tally = self.tally(tally_id)
+        index = list(filter_bins) + [slice(None)] * (len(tally['filters']) - len(filter_bins))
+        index.append(slice(None) if nuclide is None else tally['nuclides'].index(nuclide))
+        index.append(slice(None) if score is None else tally['scores'].index(score))
+        return tuple(index)
+
+    def mean(self, tally_id, score=None, nuclide=None, filter_bins=()):
+        """Returns a memory mapped view of the mean, optionally for one score, nuclide and bin of the other filters.
+
+        The last three axes are z, y and x of the mesh (or the third, second and first mesh index).
+        """
+
+        return self._array(tally_id, 'mean')[self._index(tally_id, score, nuclide, filter_bins)]
+
+    def std_dev(self, tally_id, score=None, nuclide=None, filter_bins=()):
+        """Returns a memory mapped view of the standard deviation, indexed as mean."""
+
+        return self._array(tally_id, 'std_dev')[self._index(tally_id, score, nuclide, filter_bins)]
+
+    def view(self, tally_id, score=None, nuclide=None, filter_bins=()):
+        """Returns a MeshTallyView of one score, nuclide and filter bin of a tally on a regular mesh."""
+
+        from mesh_tally_slices import MeshTallyView
+
+        mesh_type = self.mesh(tally_id)['type']
+        if mesh_type != 'regular':
+            raise TypeError('Only regular meshes can be sliced, tally {} is on a {} mesh'.format(tally_id, mesh_type))
+        tally = self.tally(tally_id)
+        score = tally['scores'][0] if score is None else score
+        nuclide = tally['nuclides'][0] if nuclide is None else nuclide
+        filter_bins = tuple(filter_bins) + (0,) * (len(tally['filters']) - len(filter_bins))
+        name = tally['name'] or 'tally_{}'.format(tally_id)
+        return MeshTallyView(self.coordinates(tally_id), self.mean(tally_id, score, nuclide, filter_bins),
+                             self.std_dev(tally_id, score, nuclide, filter_bins), name)
+
+
+def open_cache(statepoint_filename, tally_ids, directory=None):
+    """Returns the MeshTallyCache of a statepoint, writing it first if it is missing, out of date or lacks a tally.
+
+    A cache written from a different statepoint file is replaced. Only the missing
+    tallies are written to a cache that is up to date.
+    """
+
+    if directory is None:
+        directory = os.path.splitext(statepoint_filename)[0] + '_cache'
+    index_filename = os.path.join(directory, INDEX_FILENAME)
+    if os.path.exists(index_filename):
+        cache = MeshTallyCache(directory)
+        if _is_current(cache.index, statepoint_filename):
+            missing = [tally_id for tally_id in tally_ids if tally_id not in cache.tally_ids]
+            if len(missing) == 0:
+                return cache
+            tally_ids = missing
+    write_cache(statepoint_filename, tally_ids, directory)
+    return MeshTallyCache(directory)
+
+
+def main():
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    ap.add_argument('-i', '--input',
+                    required=True,
+                    help='Path to statepoint h5 file')
+
+    ap.add_argument('-t', '--tally-id',
+                    type=int,
+                    nargs='+',
+                    required=True,
+                    help='Ids of the mesh tallies to cache')
+
+    ap.add_argument('-o', '--output',
+                    help='Directory of the cache, <statepoint name>_cache by default')
+
+    args = ap.parse_args()
+
+    write_cache(args.input, args.tally_id, args.output)
+
+
+if __name__ == "__main__":
+    main()
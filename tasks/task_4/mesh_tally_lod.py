@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""mesh_tally_lod.py: builds coarser copies of mesh tallies for quick previews of large meshes."""
+
+import glob
+import os
+import re
+from collections import OrderedDict
+
+import numpy as np
+
+from mesh_tally_vtk import read_vtr, write_vtr
+
+
+def coarsen(mean, std_dev, dimension):
+    """Merges each block of 2 x 2 x 2 voxels of a regular mesh tally into one voxel.
+
+    mean and std_dev are flat arrays in mesh order (x varies fastest). Mesh
+    tallies are integrated over each voxel, so the coarse mean is the sum of the
+    voxels in the block and its variance is the sum of their variances, assuming
+    the voxels are independent. Axes with an odd number of voxels keep a thinner
+    last voxel and axes with one voxel are not merged. Returns the coarse mean,
+    std_dev and dimension.
+    """
+
+    shape = tuple(reversed(dimension))
+    mean = np.asarray(mean, dtype=float).reshape(shape)
+    variance = np.asarray(std_dev, dtype=float).reshape(shape)**2
+
+    # odd axes are padded with zeros so every block has two voxels along each merged axis
+    factors = [2 if n > 1 else 1 for n in shape]
+    padding = [(0, (-n) % factor) for n, factor in zip(shape, factors)]
+    mean = np.pad(mean, padding)
+    variance = np.pad(variance, padding)
+
+    coarse_shape = tuple(n // factor for n, factor in zip(mean.shape, factors))
+    blocks = [value for n, factor in zip(coarse_shape, factors) for value in (n, factor)]
+    block_axes = (1, 3, 5)
+    coarse_mean = np.sum(mean.reshape(blocks), axis=block_axes)
+    coarse_std_dev = np.sqrt(np.sum(variance.reshape(blocks), axis=block_axes))
+
+    return coarse_mean.ravel(), coarse_std_dev.ravel(), tuple(reversed(coarse_shape))
+
+
+def coarsen_coordinates(coordinates):
+    """Returns every other vertex coordinate, keeping the last one, to match coarsen."""
+
+    if len(coordinates) <= 2:
+        return np.asarray(coordinates)
+    coarse = coordinates[::2]
+    if (len(coordinates) - 1) % 2:
+        coarse = np.append(coarse, coordinates[-1])
+    return np.asarray(coarse)
+
+
+def build_pyramid(coordinates, arrays, levels=None):
+    """Returns a list of (coordinates, arrays) from the full mesh to a single voxel, halving the resolution each level.
+
+    arrays is a dictionary of names to (mean, std_dev) pairs, as from mesh_tally_arrays.
+    """
+
+    dimension = tuple(len(axis_coordinates) - 1 for axis_coordinates in coordinates)
+    pyramid = [(coordinates, arrays)]
+    while max(dimension) > 1 and (levels is None or len(pyramid) < levels):
+        coarse_arrays = OrderedDict()
+        for name, (mean, std_dev) in arrays.items():
+            coarse_mean, coarse_std_dev, _ = coarsen(mean, std_dev, dimension)
+            coarse_arrays[name] = (coarse_mean, coarse_std_dev)
+        coordinates = [coarsen_coordinates(axis_coordinates) for axis_coordinates in coordinates]
+        arrays = coarse_arrays
+        dimension = tuple(len(axis_coordinates) - 1 for axis_coordinates in coordinates)
+        pyramid.append((coordinates, arrays))
+    return pyramid
+
+
+def write_pyramid(coordinates, arrays, basename, levels=None):
+    """Writes each level of the pyramid to <basename>_lod<level>.vtr, level 0 being the full mesh."""
+
+    filenames = []
+    for level, (level_coordinates, level_arrays) in enumerate(build_pyramid(coordinates, arrays, levels)):
+        fields = OrderedDict()
+        for name, (mean, std_dev) in level_arrays.items():
+            fields[name] = mean
+            fields[name + '_std_dev'] = std_dev
+        filename = '{}_lod{}.vtr'.format(basename, level)
+        write_vtr(level_coordinates, fields, filename)
+        filenames.append(filename)
+    return filenames
+
+
+def pyramid_from_vtr(filename, basename=None, levels=None):
+    """Builds the pyramid of a .vtr file written by openmc-statepoint-3d.py, keeping the mean and std_dev arrays."""
+
+    coordinates, fields = read_vtr(filename)
+    arrays = OrderedDict((name, (values, fields[name + '_std_dev'])) for name, values in fields.items()
+                         if name + '_std_dev' in fields)
+    if basename is None:
+        basename = os.path.splitext(filename)[0]
+    return write_pyramid(coordinates, arrays, basename, levels)
+
+
+def find_pyramid(basename):
+    """Returns the pyramid filenames of basename, coarsest level first."""
+
+    filenames = glob.glob(glob.escape(basename) + '_lod*.vtr')
+    levels = [int(re.search(r'_lod(\d+)\.vtr$', filename).group(1)) for filename in filenames]
+    return [filename for level, filename in sorted(zip(levels, filenames), reverse=True)]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""mesh_tally_slices.py: extracts slices, line profiles and region integrals of regular mesh tallies without paraview."""
+
+from collections import namedtuple
+
+import numpy as np
+import openmc
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+from mesh_tallies import get_mesh_filter, mesh_tally_arrays
+from mesh_tally_vtk import read_vtr
+
+
+AXES = {'x': 0, 'y': 1, 'z': 2}
+
+# u and v are the vertex coordinates of the slice, mean and std_dev have (len(v) - 1, len(u) - 1) values
+Slice = namedtuple('Slice', ['u', 'v', 'mean', 'std_dev', 'u_axis', 'v_axis'])
+
+# edges are the vertex coordinates along the profile, mean and std_dev have len(edges) - 1 values
+Profile = namedtuple('Profile', ['edges', 'mean', 'std_dev', 'axis'])
+
+
+def _axis_number(axis):
+    return AXES[axis] if isinstance(axis, str) else int(axis)
+
+
+def _overlap(edges, low, high):
+    """Returns the fraction of each bin between edges that lies between low and high."""
+
+    widths = np.diff(edges)
+    overlap = np.clip(np.minimum(edges[1:], high) - np.maximum(edges[:-1], low), 0., None)
+    return overlap / widths
+
+
+class MeshTallyView:
+    """A regular mesh tally as (z, y, x) numpy arrays, with slices and profiles returned as views.
+
+    coordinates are the x, y and z vertex coordinates of the mesh and mean and
+    std_dev are flat arrays in mesh order (x varies fastest), as returned by
+    mesh_tally_arrays or read_vtr. The arrays are reshaped, not copied, so views
+    of a memory mapped file only read the values that are used.
+    """
+
+    def __init__(self, coordinates, mean, std_dev=None, name=''):
+        self.coordinates = [np.asarray(axis_coordinates, dtype=float) for axis_coordinates in coordinates]
+        self.dimension = tuple(len(axis_coordinates) - 1 for axis_coordinates in self.coordinates)
+        shape = tuple(reversed(self.dimension))
+        self.mean = np.asarray(mean).reshape(shape)
+        self.std_dev = np.zeros(shape) if std_dev is None else np.asarray(std_dev).reshape(shape)
+        self.name = name
+
+    @classmethod
+    def from_statepoint(cls, statepoint, tally_id, name=None):
+        """Reads a mesh tally from a statepoint (filename or openmc.StatePoint).
+
+        name selects one of the arrays of mesh_tally_arrays when the tally has
+        several scores, nuclides or filter bins, otherwise the first is used.
+        """
+
+        if not isinstance(statepoint, openmc.StatePoint):
+            statepoint = openmc.StatePoint(statepoint)
+        tally = statepoint.get_tally(id=tally_id)
+        mesh = get_mesh_filter(tally).mesh
+        if not isinstance(mesh, openmc.RegularMesh):
+            raise TypeError('Only regular meshes can be sliced, tally {} is on a {}'.format(
+                tally_id, type(mesh).__name__))
+        coordinates = [np.linspace(low, high, n + 1) for low, high, n in
+                       zip(mesh.lower_left, mesh.upper_right, mesh.dimension)]
+
+        arrays = mesh_tally_arrays(tally)
+        if name is None:
+            name = next(iter(arrays))
+        mean, std_dev = arrays[name]
+        return cls(coordinates, mean, std_dev, name)
+
+    @classmethod
+    def from_vtr(cls, filename, name=None):
+        """Memory maps an array (and its _std_dev array if present) of a .vtr file written by openmc-statepoint-3d.py."""
+
+        coordinates, arrays = read_vtr(filename)
+        if name is None:
+            name = next(iter(arrays))
+        return cls(coordinates, arrays[name], arrays.get(name + '_std_dev'), name)
+
+    def index(self, axis, position):
+        """Returns the index of the mesh bin along axis that contains position."""
+
+        edges = self.coordinates[_axis_number(axis)]
+        if not edges[0] <= position <= edges[-1]:
+            raise ValueError('{} is outside the mesh ({} to {})'.format(position, edges[0], edges[-1]))
+        return min(int(np.searchsorted(edges, position, side='right')) - 1, len(edges) - 2)
+
+    def slice(self, axis, position):
+        """Returns the Slice normal to axis ('x', 'y' or 'z') through position, as views of the tally."""
+
+        axis = _axis_number(axis)
+        u_axis, v_axis = [other for other in range(3) if other != axis]
+        # the arrays are indexed (z, y, x), so mesh axis n is array axis 2 - n
+        index = [slice(None)] * 3
+        index[2 - axis] = self.index(axis, position)
+        index = tuple(index)
+        return Slice(self.coordinates[u_axis], self.coordinates[v_axis], self.mean[index], self.std_dev[index],
+                     u_axis, v_axis)
+
+    def profile(self, axis, point):
+        """Returns the Profile along axis through the (x, y, z) point, as views of the tally."""
+
+        axis = _axis_number(axis)
+        index = tuple(slice(None) if other == axis else self.index(other, point[other]) for other in (2, 1, 0))
+        return Profile(self.coordinates[axis], self.mean[index], self.std_dev[index], axis)
+
+    def integrate(self, lower_left=None, upper_right=None):
+        """Returns the sum of the tally and its standard deviation over a box, counting part of any voxel on the edge.
+
+        Mesh tallies are already integrated over each voxel, so a voxel half inside the
+        box adds half its value. The voxels are assumed to be independent.
+        """
+
+        lower_left = [edges[0] for edges in self.coordinates] if lower_left is None else lower_left
+        upper_right = [edges[-1] for edges in self.coordinates] if upper_right is None else upper_right
+
+        fractions = []
+        index = []
+        for edges, low, high in zip(self.coordinates, lower_left, upper_right):
+            fraction = _overlap(edges, low, high)
+            inside = np.nonzero(fraction)[0]
+            if len(inside) == 0:
+                return 0., 0.
+            # only the voxels that overlap the box are read
+            index.append(slice(inside[0], inside[-1] + 1))
+            fractions.append(fraction[inside[0]:inside[-1] + 1])
+        fx, fy, fz = fractions
+        index = tuple(reversed(index))
+
+        total = np.einsum('k,j,i,kji->', fz, fy, fx, self.mean[index])
+        variance = np.einsum('k,j,i,kji->', fz**2, fy**2, fx**2, np.square(self.std_dev[index]))
+        return float(total), float(np.sqrt(variance))
+
+    def plot_slice(self, axis, position, filename, log=True, std_dev=False, title=None):
+        """Saves a heatmap of the slice to filename, without needing a display."""
+
+        tally_slice = self.slice(axis, position)
+        values = tally_slice.std_dev if std_dev else tally_slice.mean
+        names = 'xyz'
+
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+        positive = values[values > 0]
+        norm = LogNorm(vmin=positive.min(), vmax=positive.max()) if log and positive.size else None
+        image = ax.pcolormesh(tally_slice.u, tally_slice.v, values, norm=norm, shading='flat')
+        ax.set_xlabel(names[tally_slice.u_axis] + ' [cm]')
+        ax.set_ylabel(names[tally_slice.v_axis] + ' [cm]')
+        ax.set_aspect('equal')
+        fig.colorbar(image, ax=ax, label=self.name + (' std_dev' if std_dev else ''))
+        if title is None:
+            title = '{} at {}={:g} cm'.format(self.name, names[_axis_number(axis)], position)
+        ax.set_title(title)
+        fig.savefig(filename)
+        return filename
+
+    def plot_profile(self, axis, point, filename, log=True, title=None):
+        """Saves a plot of the profile with error bars to filename, without needing a display."""
+
+        profile = self.profile(axis, point)
+        centres = 0.5 * (profile.edges[1:] + profile.edges[:-1])
+
+        fig = Figure(figsize=(8, 5))
+        ax = fig.add_subplot()
+        ax.errorbar(centres, profile.mean, yerr=profile.std_dev, drawstyle='steps-mid')
+        if log and np.any(profile.mean > 0):
+            ax.set_yscale('log')
+        ax.set_xlabel('xyz'[profile.axis] + ' [cm]')
+        ax.set_ylabel(self.name)
+        if title is None:
+            title = '{} along {} through ({:g}, {:g}, {:g})'.format(self.name, 'xyz'[profile.axis], *point)
+        ax.set_title(title)
+        fig.savefig(filename)
+        return filename
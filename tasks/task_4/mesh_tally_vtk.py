@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+
+"""mesh_tally_vtk.py: streams mesh tally results from statepoint h5 files into VTK XML files chunk by chunk."""
+
+import glob
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from xml.sax.saxutils import quoteattr, unescape
+
+import h5py
+import numpy as np
+
+from mesh_tallies import array_names, energy_bin_labels, mesh_points
+
+
+def _decode(value):
+    return value.decode().strip() if isinstance(value, bytes) else str(value).strip()
+
+
+# the vertex grids of each curvilinear mesh type, in mesh order
+MESH_GRIDS = {'cylindrical': ('r_grid', 'phi_grid', 'z_grid'),
+              'spherical': ('r_grid', 'theta_grid', 'phi_grid')}
+
+
+def read_mesh(h5file, mesh_id):
+    """Returns the type, dimension and extent (or vertex grids) of a mesh in a statepoint file as a dictionary."""
+
+    group = h5file['tallies/meshes/mesh {}'.format(mesh_id)]
+    mesh = {'id': mesh_id, 'type': _decode(group['type'][()])}
+    if mesh['type'] in MESH_GRIDS:
+        mesh['grids'] = [group[name][()] for name in MESH_GRIDS[mesh['type']]]
+        mesh['origin'] = group['origin'][()] if 'origin' in group else np.zeros(3)
+        mesh['dimension'] = tuple(len(grid) - 1 for grid in mesh['grids'])
+    else:
+        mesh['dimension'] = tuple(int(n) for n in group['dimension'][()])
+        mesh['lower_left'] = group['lower_left'][()]
+        mesh['upper_right'] = group['upper_right'][()]
+    return mesh
+
+
+def read_mesh_tally_info(h5file, tally_id):
+    """Returns the metadata of a mesh tally in a statepoint file without reading its results."""
+
+    group = h5file['tallies/tally {}'.format(tally_id)]
+
+    filters = []
+    if int(group['n_filters'][()]) > 0:
+        for filter_id in group['filters'][()]:
+            filter_group = h5file['tallies/filters/filter {}'.format(filter_id)]
+            filters.append({'type': _decode(filter_group['type'][()]),
+                            'n_bins': int(filter_group['n_bins'][()]),
+                            'bins': filter_group['bins'][()]})
+
+    filter_types = [tally_filter['type'] for tally_filter in filters]
+    if 'mesh' not in filter_types:
+        raise ValueError('Tally {} does not have a mesh filter'.format(tally_id))
+    mesh_axis = filter_types.index('mesh')
+
+    return {'id': tally_id,
+            'name': _decode(group['name'][()]) if 'name' in group else '',
+            'n_realizations': int(group['n_realizations'][()]),
+            'scores': [_decode(score) for score in group['score_bins'][()]],
+            'nuclides': [_decode(nuclide) for nuclide in group['nuclides'][()]],
+            'filters': filters,
+            'mesh_axis': mesh_axis,
+            'mesh': read_mesh(h5file, int(np.ravel(filters[mesh_axis]['bins'])[0]))}
+
+
+def mesh_coordinates(mesh):
+    """Returns the x, y and z vertex coordinates of a regular mesh.
+
+    Cylindrical and spherical meshes are not rectilinear, so the cartesian
+    positions of their vertices are returned instead, as an (n3 + 1, n2 + 1, n1 + 1, 3)
+    array from mesh_points.
+    """
+
+    if mesh['type'] in MESH_GRIDS:
+        return mesh_points(mesh['type'], mesh['grids'], mesh['origin'])
+    if mesh['type'] != 'regular':
+        raise ValueError('Streaming export of {} meshes is not supported'.format(mesh['type']))
+    return [np.linspace(low, high, n + 1) for low, high, n in zip(mesh['lower_left'], mesh['upper_right'], mesh['dimension'])]
+
+
+def grid_dimension(coordinates):
+    """Returns the number of cells along each axis of the coordinates or vertex positions from mesh_coordinates."""
+
+    if isinstance(coordinates, np.ndarray) and coordinates.ndim == 4:
+        return tuple(n - 1 for n in reversed(coordinates.shape[:3]))
+    return tuple(len(axis_coordinates) - 1 for axis_coordinates in coordinates)
+
+
+def _other_filter_labels(tally):
+    labels = []
+    for axis, tally_filter in enumerate(tally['filters']):
+        if axis == tally['mesh_axis']:
+            continue
+        if tally_filter['type'] == 'energy':
+            edges = np.ravel(tally_filter['bins'])
+            labels.append(energy_bin_labels(zip(edges[:-1], edges[1:])))
+        else:
+            labels.append(['{}{}'.format(tally_filter['type'], i) for i in range(tally_filter['n_bins'])])
+    return labels
+
+
+def chunk_statistics(results, n_realizations):
+    """Returns the mean, standard deviation and relative error from a (bins, score bins, 2) block of sums.
+
+    nan values, for example from a single realization, are replaced by 0.
+    """
+
+    mean = results[..., 0] / n_realizations
+    if n_realizations > 1:
+        variance = (results[..., 1] / n_realizations - mean**2) / (n_realizations - 1)
+        std_dev = np.sqrt(np.maximum(variance, 0.))
+    else:
+        std_dev = np.zeros_like(mean)
+    rel_error = np.zeros_like(mean)
+    np.divide(std_dev, mean, out=rel_error, where=mean != 0.)
+    return np.nan_to_num(mean), np.nan_to_num(std_dev), np.abs(np.nan_to_num(rel_error))
+
+
+def _start_vtr(vtr, coordinates, fields):
+    """Writes the header, coordinates and array lengths of a .vtr file with uncompressed appended Float64 arrays.
+
+    When coordinates is an array of vertex positions (from a cylindrical or
+    spherical mesh) a StructuredGrid (.vts) file is written instead.
+    Returns the file position of the values of each field, which the caller fills in.
+    """
+
+    dimension = grid_dimension(coordinates)
+    n_cells = int(np.prod(dimension))
+    structured = isinstance(coordinates, np.ndarray) and coordinates.ndim == 4
+    grid_type = 'StructuredGrid' if structured else 'RectilinearGrid'
+
+    # each array in the appended section is an 8 byte length followed by the values
+    cell_block_size = 8 + 8 * n_cells
+    offsets = [i * cell_block_size for i in range(len(fields))]
+    coordinate_offset = len(fields) * cell_block_size
+
+    extent = '0 {} 0 {} 0 {}'.format(*dimension)
+    header = ['<?xml version="1.0"?>',
+              '<VTKFile type="{}" version="1.0" byte_order="LittleEndian" header_type="UInt64">'.format(grid_type),
+              '  <{} WholeExtent="{}">'.format(grid_type, extent),
+              '    <Piece Extent="{}">'.format(extent),
+              '      <CellData>']
+    for name, offset in zip(fields, offsets):
+        header.append('        <DataArray type="Float64" Name={} format="appended" offset="{}"/>'.format(
+            quoteattr(name), offset))
+    header.append('      </CellData>')
+    if structured:
+        header.extend(['      <Points>',
+                       '        <DataArray type="Float64" NumberOfComponents="3" format="appended" offset="{}"/>'.format(
+                           coordinate_offset),
+                       '      </Points>'])
+        coordinate_arrays = [coordinates.ravel()]
+    else:
+        header.append('      <Coordinates>')
+        for axis, axis_coordinates in zip('xyz', coordinates):
+            header.append('        <DataArray type="Float64" Name="{}-coords" format="appended" offset="{}"/>'.format(
+                axis, coordinate_offset))
+            coordinate_offset += 8 + 8 * len(axis_coordinates)
+        header.append('      </Coordinates>')
+        coordinate_arrays = coordinates
+    header.extend(['    </Piece>',
+                   '  </{}>'.format(grid_type),
+                   '  <AppendedData encoding="raw">',
+                   '   _'])
+
+    vtr.write('\n'.join(header).encode())
+    data_start = vtr.tell()
+
+    # the length of every cell array, then the coordinates, which are small
+    for offset in offsets:
+        vtr.seek(data_start + offset)
+        vtr.write(np.uint64(8 * n_cells).astype('<u8').tobytes())
+    vtr.seek(data_start + len(fields) * cell_block_size)
+    for axis_coordinates in coordinate_arrays:
+        vtr.write(np.uint64(8 * len(axis_coordinates)).astype('<u8').tobytes())
+        vtr.write(np.asarray(axis_coordinates, dtype='<f8').tobytes())
+    vtr.write(b'\n  </AppendedData>\n</VTKFile>\n')
+
+    return {name: data_start + offset + 8 for name, offset in zip(fields, offsets)}
+
+
+def write_vtr(coordinates, arrays, output):
+    """Writes a dictionary of cell arrays (flat, x varying fastest) on a rectilinear grid to a .vtr file.
+
+    Vertex positions of a cylindrical or spherical mesh can be given as
+    coordinates to write a .vts file.
+    """
+
+    with open(output, 'wb') as vtr:
+        offsets = _start_vtr(vtr, coordinates, list(arrays))
+        for name, values in arrays.items():
+            vtr.seek(offsets[name])
+            vtr.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+
+    print('Writing %s' % output)
+
+
+def read_vtr(filename):
+    """Returns the coordinates and memory mapped cell arrays of a .vtr file written by this module.
+
+    Arrays are only read from disk when they are used, so a few arrays of a large file can be loaded quickly.
+    """
+
+    marker = b'<AppendedData encoding="raw">'
+    with open(filename, 'rb') as vtr:
+        header = b''
+        # the appended data starts after the first _ following the marker
+        while marker not in header or b'_' not in header[header.index(marker):]:
+            block = vtr.read(65536)
+            if not block:
+                raise ValueError(filename + ' does not have raw appended data')
+            header += block
+        data_start = header.index(b'_', header.index(marker)) + 1
+        header = header[:data_start]
+
+    header = header.decode()
+    dimension = [int(n) for n in re.search(r'WholeExtent="0 (\d+) 0 (\d+) 0 (\d+)"', header).groups()]
+    data_arrays = re.findall(r'<DataArray type="Float64" Name=("[^"]*"|\'[^\']*\') format="appended" offset="(\d+)"/>', header)
+
+    arrays = OrderedDict()
+    coordinates = []
+    for quoted_name, offset in data_arrays:
+        name = unescape(quoted_name[1:-1], {'&quot;': '"', '&apos;': "'"})
+        if name in ('x-coords', 'y-coords', 'z-coords'):
+            length = dimension['xyz'.index(name[0])] + 1
+            coordinates.append(np.fromfile(filename, dtype='<f8', count=length, offset=data_start + int(offset) + 8))
+        else:
+            arrays[name] = np.memmap(filename, dtype='<f8', mode='r', offset=data_start + int(offset) + 8,
+                                     shape=(int(np.prod(dimension)),))
+
+    return coordinates, arrays
+
+
+def write_mesh_tally_vtr(statepoint_filename, tally_ids, output, labels=None, chunk_size=2**20, coordinates=None,
+                         mesh_id=None):
+    """Writes mesh tallies to a .vtr file, reading chunk_size mesh bins at a time from the statepoint.
+
+    Every score, nuclide and filter bin of each tally is written with its
+    standard deviation and relative error, using the names of mesh_tally_arrays.
+    The arrays are uncompressed in the appended section, so their positions are
+    known in advance and each chunk is written straight to its place in the file.
+    Peak memory is set by chunk_size rather than the size of the mesh.
+    coordinates can be given to reuse the vertex coordinates of a previous file.
+    Cylindrical and spherical meshes are written as a StructuredGrid on their
+    curved vertices, which should have a .vts extension. If mesh_id is given, a
+    ValueError is raised when the tallies are on another mesh.
+    """
+
+    with h5py.File(statepoint_filename, 'r') as f:
+        tallies = [read_mesh_tally_info(f, tally_id) for tally_id in tally_ids]
+        mesh = tallies[0]['mesh']
+        for tally in tallies[1:]:
+            if tally['mesh']['id'] != mesh['id']:
+                raise ValueError('All tallies must be on the same mesh')
+        if mesh_id is not None and mesh['id'] != mesh_id:
+            raise ValueError('The tallies are on mesh {}, not mesh {}'.format(mesh['id'], mesh_id))
+
+        if coordinates is None:
+            coordinates = mesh_coordinates(mesh)
+        elif grid_dimension(coordinates) != mesh['dimension']:
+            raise ValueError('The coordinates do not match the mesh in ' + statepoint_filename)
+        extension = '.vts' if isinstance(coordinates, np.ndarray) else '.vtr'
+        if not output.endswith(extension):
+            raise ValueError('Tallies on {} meshes are written to {} files'.format(mesh['type'], extension))
+        n_cells = int(np.prod(mesh['dimension']))
+
+        fields = []
+        for tally_index, tally in enumerate(tallies):
+            label = labels[tally_index] if labels is not None else (tally['name'] or 'tally_{}'.format(tally['id']))
+            for name in array_names(label, tally['scores'], tally['nuclides'], _other_filter_labels(tally)):
+                fields.extend([name, name + '_std_dev', name + '_rel_error'])
+
+        with open(output, 'wb') as vtr:
+            offsets = _start_vtr(vtr, coordinates, fields)
+
+            field_index = 0
+            for tally in tallies:
+                results = f['tallies/tally {}/results'.format(tally['id'])]
+                filter_shape = [tally_filter['n_bins'] for tally_filter in tally['filters']]
+                strides = [int(np.prod(filter_shape[axis + 1:])) for axis in range(len(filter_shape))]
+                mesh_stride = strides[tally['mesh_axis']]
+                other_shape = [n for axis, n in enumerate(filter_shape) if axis != tally['mesh_axis']]
+                other_strides = [stride for axis, stride in enumerate(strides) if axis != tally['mesh_axis']]
+
+                for other_bins in np.ndindex(*other_shape):
+                    base = sum(b * stride for b, stride in zip(other_bins, other_strides))
+                    combination_fields = fields[field_index:field_index + 3 * results.shape[1]]
+                    for start in range(0, n_cells, chunk_size):
+                        stop = min(start + chunk_size, n_cells)
+                        # a hyperslab of the mesh bins for this combination of the other filter bins
+                        rows = slice(base + start * mesh_stride, base + (stop - 1) * mesh_stride + 1, mesh_stride)
+                        mean, std_dev, rel_error = chunk_statistics(results[rows, :, :], tally['n_realizations'])
+                        for score_bin in range(results.shape[1]):
+                            for name, values in zip(combination_fields[3 * score_bin:3 * score_bin + 3],
+                                                    (mean, std_dev, rel_error)):
+                                vtr.seek(offsets[name] + 8 * start)
+                                vtr.write(np.ascontiguousarray(values[:, score_bin], dtype='<f8').tobytes())
+                    field_index += 3 * results.shape[1]
+
+    print('Writing %s' % output)
+
+
+def write_pvd(filenames, timesteps, output):
+    """Writes a ParaView collection of the VTK files, one for each timestep (or parameter value)."""
+
+    directory = os.path.dirname(os.path.abspath(output))
+    lines = ['<?xml version="1.0"?>',
+             '<VTKFile type="Collection" version="0.1" byte_order="LittleEndian">',
+             '  <Collection>']
+    for filename, timestep in zip(filenames, timesteps):
+        lines.append('    <DataSet timestep="{}" group="" part="0" file={}/>'.format(
+            timestep, quoteattr(os.path.relpath(os.path.abspath(filename), directory))))
+    lines.extend(['  </Collection>', '</VTKFile>', ''])
+
+    with open(output, 'w') as pvd:
+        pvd.write('\n'.join(lines))
+
+    print('Writing %s' % output)
+
+
+def _statepoint_number(filename):
+    # statepoint.<batches>.h5 files are ordered by their number, other files keep their sorted order
+    match = re.search(r'(\d+)\.h5$', os.path.basename(filename))
+    return int(match.group(1)) if match else None
+
+
+def _convert_statepoint(filenames, **kwargs):
+    statepoint_filename, output = filenames
+    write_mesh_tally_vtr(statepoint_filename, output=output, **kwargs)
+
+
+def convert_statepoints(statepoint_filenames, tally_ids, output, labels=None, timesteps=None,
+                        chunk_size=2**20, max_workers=None, mesh_id=None):
+    """Converts the mesh tallies of many statepoints to .vtr files in a process pool and collects them in a .pvd file.
+
+    statepoint_filenames is a list of files or a glob pattern such as
+    'statepoint.*.h5'. The vtr files (vts for cylindrical and spherical meshes)
+    are written next to output, named after it and the timestep. timesteps
+    defaults to the number in each statepoint filename and can be set to
+    parameter values for a parameter sweep. The mesh is read from the first
+    statepoint and its coordinates are reused for every file. Each statepoint
+    needs its own timestep, otherwise a ValueError is raised. mesh_id is checked
+    as in write_mesh_tally_vtr.
+    """
+
+    if isinstance(statepoint_filenames, str):
+        statepoint_filenames = glob.glob(statepoint_filenames)
+    numbers = [_statepoint_number(filename) for filename in statepoint_filenames]
+    if None not in numbers:
+        statepoint_filenames = [filename for number, filename in sorted(zip(numbers, statepoint_filenames))]
+    else:
+        statepoint_filenames = sorted(statepoint_filenames)
+    if len(statepoint_filenames) == 0:
+        raise ValueError('No statepoint files to convert')
+
+    if timesteps is None:
+        timesteps = [_statepoint_number(filename) for filename in statepoint_filenames]
+        if None in timesteps:
+            timesteps = list(range(len(statepoint_filenames)))
+
+    with h5py.File(statepoint_filenames[0], 'r') as f:
+        mesh = read_mesh_tally_info(f, tally_ids[0])['mesh']
+    if mesh_id is not None and mesh['id'] != mesh_id:
+        raise ValueError('The tallies are on mesh {}, not mesh {}'.format(mesh['id'], mesh_id))
+    coordinates = mesh_coordinates(mesh)
+
+    basename = os.path.splitext(output)[0]
+    extension = '.vts' if isinstance(coordinates, np.ndarray) else '.vtr'
+    vtr_filenames = ['{}_{}{}'.format(basename, timestep, extension) for timestep in timesteps]
+    if len(vtr_filenames) != len(statepoint_filenames):
+        raise ValueError('{} timesteps were given for {} statepoints'.format(
+            len(vtr_filenames), len(statepoint_filenames)))
+    if len(set(vtr_filenames)) != len(vtr_filenames):
+        # the statepoints would overwrite each other's files
+        raise ValueError('The timesteps {} are not unique'.format(list(timesteps)))
+
+    convert = partial(_convert_statepoint, tally_ids=tally_ids, labels=labels,
+                      chunk_size=chunk_size, coordinates=coordinates, mesh_id=mesh_id)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(convert, zip(statepoint_filenames, vtr_filenames)))
+
+    write_pvd(vtr_filenames, timesteps, output)
+
+    return vtr_filenames
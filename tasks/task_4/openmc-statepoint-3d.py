@@ -7,11 +7,22 @@ statepoint file to other mesh formats for visualization
 
 import argparse
 import sys
-import math
 import openmc
 import numpy as np
 
-def write_moab(xs, ys, zs, tally_label, tally_data, error_data, outfile):
+from mesh_tallies import mesh_grids, mesh_points, mesh_tally_arrays, relative_error
+from mesh_tally_lod import pyramid_from_vtr, write_pyramid
+from mesh_tally_vtk import convert_statepoints, write_mesh_tally_vtr
+from tally_arithmetic import TallyField, mesh_volumes, per_second, per_volume
+
+def _fields(arrays):
+    # each tally array is written with its standard deviation and relative error
+    for label, (mean, std_dev) in arrays.items():
+        yield label, mean
+        yield label + '_std_dev', std_dev
+        yield label + '_rel_error', relative_error(mean, std_dev)
+
+def write_moab(points, arrays, outfile):
     # attempt to import pymoab
     try:
         from pymoab import core
@@ -27,32 +38,29 @@ def write_moab(xs, ys, zs, tally_label, tally_data, error_data, outfile):
 
     scd = ScdInterface(mb)
 
-    coords = []
-    for k in zs:
-        for j in ys:
-            for i in xs:
-                coords += [i,j,k]
+    # vertex coordinates from mesh_points, with the first mesh index varying fastest, as one contiguous array
+    coords = np.ascontiguousarray(points, dtype=float).ravel()
 
     low = HomCoord([0, 0, 0, 0])
-    high = HomCoord([len(xs) - 1, len(ys) - 1, len(zs) - 1, 0])
+    high = HomCoord([points.shape[2] - 1, points.shape[1] - 1, points.shape[0] - 1, 0])
 
     scdbox = scd.construct_box(low, high, coords)
 
     hexes = mb.get_entities_by_type(0, types.MBHEX)
 
-    tally_tag = mb.tag_get_handle(tally_label,1,types.MB_TYPE_DOUBLE,types.MB_TAG_DENSE,True)
-    error_tag = mb.tag_get_handle("error_tag",1,types.MB_TYPE_DOUBLE,types.MB_TAG_DENSE,True)
-
-    mb.tag_set_data(tally_tag,hexes,tally_data)
-    mb.tag_set_data(error_tag,hexes,error_data)
+    # all hexes are tagged in one call per field, in the same x fastest order as the tally
+    for label, data in _fields(arrays):
+        tag = mb.tag_get_handle(label,1,types.MB_TYPE_DOUBLE,types.MB_TAG_DENSE,True)
+        mb.tag_set_data(tag,hexes,np.ascontiguousarray(data, dtype=float))
 
     print('Writing %s' % outfile)
 
     mb.write_file(outfile)
 
-def write_vtk(xs, ys, zs, tally_label, tally_data, error_data, outfile):
+def write_vtk(xs, ys, zs, arrays, outfile):
     try:
         import vtk
+        from vtk.util.numpy_support import numpy_to_vtk
     except (ImportError, ModuleNotFoundError) as e:
         msg = "Conversion to VTK requested," \
               "but the Python VTK module is not installed."
@@ -65,7 +73,6 @@ def write_vtk(xs, ys, zs, tally_label, tally_data, error_data, outfile):
     vtk_x_array = vtk.vtkDoubleArray()
     vtk_x_array.SetName('x-coords')
     vtk_x_array.SetArray(xs, len(xs), True)
-    print(vtk_x_array)
     vtk_box.SetXCoordinates(vtk_x_array)
 
     vtk_y_array = vtk.vtkDoubleArray()
@@ -78,18 +85,10 @@ def write_vtk(xs, ys, zs, tally_label, tally_data, error_data, outfile):
     vtk_z_array.SetArray(zs, len(zs), True)
     vtk_box.SetZCoordinates(vtk_z_array)
 
-    tally = np.array(tally_data)
-    tally_data = vtk.vtkDoubleArray()
-    tally_data.SetName(tally_label)
-    tally_data.SetArray(tally, tally.size, True)
-
-    error = np.array(error_data)
-    error_data = vtk.vtkDoubleArray()
-    error_data.SetName("error_tag")
-    error_data.SetArray(error, error.size, True)
-
-    vtk_box.GetCellData().AddArray(tally_data)
-    vtk_box.GetCellData().AddArray(error_data)
+    for label, data in _fields(arrays):
+        vtk_data = numpy_to_vtk(np.ascontiguousarray(data, dtype=float), deep=True)
+        vtk_data.SetName(label)
+        vtk_box.GetCellData().AddArray(vtk_data)
 
     writer = vtk.vtkRectilinearGridWriter()
 
@@ -101,21 +100,58 @@ def write_vtk(xs, ys, zs, tally_label, tally_data, error_data, outfile):
 
     writer.Write()
 
+def write_vtk_structured(points, arrays, outfile):
+    # cylindrical and spherical meshes are written on their curved vertices
+    try:
+        import vtk
+        from vtk.util.numpy_support import numpy_to_vtk
+    except (ImportError, ModuleNotFoundError) as e:
+        msg = "Conversion to VTK requested," \
+              "but the Python VTK module is not installed."
+        raise ImportError(msg)
+
+    vtk_grid = vtk.vtkStructuredGrid()
+
+    vtk_grid.SetDimensions(points.shape[2], points.shape[1], points.shape[0])
+
+    vtk_points = vtk.vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(np.ascontiguousarray(points.reshape(-1, 3), dtype=float), deep=True))
+    vtk_grid.SetPoints(vtk_points)
+
+    for label, data in _fields(arrays):
+        vtk_data = numpy_to_vtk(np.ascontiguousarray(data, dtype=float), deep=True)
+        vtk_data.SetName(label)
+        vtk_grid.GetCellData().AddArray(vtk_data)
+
+    writer = vtk.vtkStructuredGridWriter()
+
+    writer.SetFileName(outfile)
+
+    writer.SetInputData(vtk_grid)
+
+    print('Writing %s' % outfile)
+
+    writer.Write()
+
 def main():
 
     ap = argparse.ArgumentParser(description=__doc__)
 
     ap.add_argument('-i','--input',
                     required=True,
-                    help='Path to statepoint h5 file')
+                    help='Path to statepoint h5 file, or a glob pattern '
+                         'such as "statepoint.*.h5" for .pvd outputs')
 
     ap.add_argument('-n','--tally-name',
-                    help='Tally name to add to mesh')
+                    nargs='+',
+                    help='Tally names to add to mesh, one for each tally id')
 
     ap.add_argument('-t','--tally-id',
                     type=int,
+                    nargs='+',
                     required=True,
-                    help='Tally name to add to mesh')
+                    help='Tally ids to add to mesh, every score, nuclide and '
+                         'energy bin of each tally is written')
 
     ap.add_argument('-m','--mesh-id',
                     type=int,
@@ -125,10 +161,61 @@ def main():
     ap.add_argument('-o', '--output',
                     action='store',
                     default='meshtally.vtk',
-                    help='Name of outputfile (.h5m for MOAB, .vtk for VTK)')
+                    help='Name of outputfile (.h5m for MOAB, .vtk for VTK, '
+                         '.vtr for VTK XML streamed in chunks, .vts for the same '
+                         'with cylindrical and spherical meshes, .pvd for a '
+                         'collection of .vtr/.vts files from several statepoints)')
+
+    ap.add_argument('--lod',
+                    action='store_true',
+                    help='Also write coarser copies of the mesh to '
+                         '<output>_lod<level>.vtr for preview_mesh_tally.py '
+                         '(regular meshes and not .pvd outputs)')
+
+    ap.add_argument('--fusion-power',
+                    type=float,
+                    help='Fusion power in Watts, to convert the tallies from '
+                         'per source neutron to per second')
+
+    ap.add_argument('--per-volume',
+                    action='store_true',
+                    help='Divide the tallies by the volume of each mesh voxel in cm3')
 
     args = ap.parse_args()
 
+    if args.tally_name is not None and len(args.tally_name) != len(args.tally_id):
+        ap.error('a tally name is needed for each tally id')
+
+    tally_labels = args.tally_name or ["tally_{}".format(tally_id) for tally_id in args.tally_id]
+
+    if (args.fusion_power is not None or args.per_volume) and args.output[-4:] in (".pvd", ".vtr", ".vts"):
+        ap.error('--fusion-power and --per-volume are only available for .vtk and .h5m outputs')
+
+    if args.lod and args.output.endswith(".pvd"):
+        ap.error('--lod is only available for .vtr, .vtk and .h5m outputs')
+
+    if args.output.endswith(".pvd"):
+        # the input is a glob pattern of statepoints which are converted in parallel
+        print('Converting files matching %s' % args.input)
+        try:
+            convert_statepoints(args.input, args.tally_id, args.output, tally_labels, mesh_id=args.mesh_id)
+        except ValueError as e:
+            ap.error(str(e))
+        return
+
+    if args.output.endswith(".vtr") or args.output.endswith(".vts"):
+        if args.lod and args.output.endswith(".vts"):
+            ap.error('--lod is only available for regular meshes')
+        # streamed from the h5 file in chunks, so very large meshes do not have to fit in memory
+        print('Streaming tallies from file %s' % args.input)
+        try:
+            write_mesh_tally_vtr(args.input, args.tally_id, args.output, tally_labels, mesh_id=args.mesh_id)
+        except ValueError as e:
+            ap.error(str(e))
+        if args.lod:
+            pyramid_from_vtr(args.output)
+        return
+
     print('Loading file %s' % args.input)
 
     sp = openmc.StatePoint(args.input)
@@ -136,52 +223,50 @@ def main():
     print('Loading mesh with ID of %s' % args.mesh_id)
     mesh = sp.meshes[args.mesh_id]
 
-    xs = np.linspace(mesh.lower_left[0],
-                     mesh.upper_right[0],
-                     mesh.dimension[0] + 1)
-    ys = np.linspace(mesh.lower_left[1],
-                     mesh.upper_right[1],
-                     mesh.dimension[1] + 1)
-    zs = np.linspace(mesh.lower_left[2],
-                     mesh.upper_right[2],
-                     mesh.dimension[2] + 1)
-
-    tally_args = {'name' : args.tally_name,
-                  'id'   : args.tally_id}
-
-    msg = "Loading retrieving tally with \n"
-    if args.tally_name is not None:
-        msg += "Name: {}\n".format(args.tally_name)
-    if args.tally_id is not None:
-        msg += "ID: {}\n".format(args.tally_id)
-    try:
-        tally = sp.get_tally(**tally_args)
-    except LookupError as e:
-        raise e
-
-    data = tally.mean[:,0,0]
-    error = tally.std_dev[:,0,0]
-
-    data = data.tolist()
-    error = error.tolist()
-
-    for c, i in enumerate(data):
-        if math.isnan(i):
-            data[c] = 0.
-
-    for c, i in enumerate(error):
-        if math.isnan(i):
-            error[c] = 0.
-
-    if args.tally_name is None:
-        tally_label = "tally_{}".format(args.tally_id)
+    # regular meshes are written as rectilinear grids, cylindrical and spherical meshes on their curved vertices
+    mesh_type, grids, origin = mesh_grids(mesh)
+    if args.lod and mesh_type != 'regular':
+        ap.error('--lod is only available for regular meshes')
+
+    tally_names = args.tally_name if args.tally_name is not None else [None] * len(args.tally_id)
+
+    arrays = {}
+    for tally_id, tally_name in zip(args.tally_id, tally_names):
+        msg = "Loading retrieving tally with \n"
+        if tally_name is not None:
+            msg += "Name: {}\n".format(tally_name)
+        msg += "ID: {}\n".format(tally_id)
+        print(msg)
+
+        tally = sp.get_tally(name=tally_name, id=tally_id)
+
+        if tally_name is None:
+            tally_label = "tally_{}".format(tally_id)
+        else:
+            tally_label = tally_name
+
+        arrays.update(mesh_tally_arrays(tally, args.mesh_id, tally_label))
+
+    if args.fusion_power is not None or args.per_volume:
+        # every array is scaled in one pass, with the standard deviation scaled to match
+        volumes = mesh_volumes(mesh_type, grids)
+        for label, (mean, std_dev) in arrays.items():
+            field = TallyField(mean, std_dev)
+            if args.fusion_power is not None:
+                field = per_second(field, args.fusion_power)
+            if args.per_volume:
+                field = per_volume(field, volumes)
+            arrays[label] = (field.mean, field.std_dev)
+
+    if args.output.endswith(".vtk") and mesh_type == 'regular':
+        write_vtk(*grids, arrays, args.output)
+    elif args.output.endswith(".vtk"):
+        write_vtk_structured(mesh_points(mesh_type, grids, origin), arrays, args.output)
     else:
-        tally_label = args.tally_name
+        write_moab(mesh_points(mesh_type, grids, origin), arrays, args.output)
 
-    if args.output.endswith(".vtk"):
-        write_vtk(xs, ys, zs, tally_label, data, error, args.output)
-    else:
-        write_moab(xs, ys, zs, tally_label, data, error, args.output)
+    if args.lod:
+        write_pyramid(grids, arrays, args.output.rsplit('.', 1)[0])
 
 if __name__ == "__main__":
     main()
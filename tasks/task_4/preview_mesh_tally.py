@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""preview_mesh_tally.py: saves quick png previews of a mesh tally pyramid, starting from the coarsest level.
+
+The pyramid is made with openmc-statepoint-3d.py --lod, for example
+python preview_mesh_tally.py tally_on_mesh --max-cells 100000
+"""
+
+import argparse
+
+import matplotlib
+matplotlib.use('Agg')  # no display is needed
+import matplotlib.pyplot as plt
+import numpy as np
+
+from mesh_tally_lod import find_pyramid
+from mesh_tally_vtk import read_vtr
+
+
+def plot_projections(coordinates, values, title, filename):
+    """Saves the maximum of the values along each axis as xy, xz and yz heatmaps."""
+
+    dimension = [len(axis_coordinates) - 1 for axis_coordinates in coordinates]
+    values = np.asarray(values).reshape(tuple(reversed(dimension)))  # z, y, x
+
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4.5))
+    for ax, (name, axis, horizontal, vertical) in zip(axes, [('xy', 0, 0, 1), ('xz', 1, 0, 2), ('yz', 2, 1, 2)]):
+        projection = values.max(axis=axis)
+        image = ax.pcolormesh(coordinates[horizontal], coordinates[vertical], projection, shading='flat')
+        ax.set_xlabel(name[0] + ' [cm]')
+        ax.set_ylabel(name[1] + ' [cm]')
+        ax.set_aspect('equal')
+        fig.colorbar(image, ax=ax)
+    fig.suptitle(title)
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def main():
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    ap.add_argument('basename',
+                    help='Name of the pyramid files without _lod<level>.vtr')
+
+    ap.add_argument('-a', '--array',
+                    help='Name of the array to preview, the first array by default')
+
+    ap.add_argument('-c', '--max-cells',
+                    type=int,
+                    default=10**6,
+                    help='Finest level to load, in number of voxels')
+
+    ap.add_argument('-o', '--output',
+                    help='Name of the png file, <basename>_preview.png by default')
+
+    args = ap.parse_args()
+
+    filenames = find_pyramid(args.basename)
+    if len(filenames) == 0:
+        raise FileNotFoundError('No pyramid found for ' + args.basename + ', run openmc-statepoint-3d.py with --lod')
+    output = args.output if args.output is not None else args.basename + '_preview.png'
+
+    # each finer level replaces the preview, so a useful picture is available straight away
+    for filename in filenames:
+        coordinates, arrays = read_vtr(filename)
+        n_cells = int(np.prod([len(axis_coordinates) - 1 for axis_coordinates in coordinates]))
+        if n_cells > args.max_cells and filename != filenames[0]:
+            break
+
+        name = args.array if args.array is not None else next(iter(arrays))
+        values = np.asarray(arrays[name])
+        hot_spot = np.unravel_index(np.argmax(values), tuple(len(c) - 1 for c in reversed(coordinates)))
+        centre = [0.5 * (coordinates[axis][hot_spot[2 - axis]] + coordinates[axis][hot_spot[2 - axis] + 1]) for axis in range(3)]
+        message = '{}: {} voxels, maximum {:g} at x={:g} y={:g} z={:g}'.format(filename, n_cells, values.max(), *centre)
+        if name + '_std_dev' in arrays and values.max() != 0.:
+            message += ' (relative error {:.3g})'.format(np.asarray(arrays[name + '_std_dev'])[np.argmax(values)] / values.max())
+        print(message)
+
+        plot_projections(coordinates, values, name + ' (' + filename + ')', output)
+        print('Writing %s' % output)
+
+
+if __name__ == "__main__":
+    main()
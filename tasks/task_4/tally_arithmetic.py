@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+"""tally_arithmetic.py: converts tally results per source neutron into engineering quantities, propagating the errors."""
+
+import re
+
+import numpy as np
+
+
+EV_TO_JOULES = 1.60218e-19  # multiplication factor to convert eV to Joules
+DT_FUSION_ENERGY = 17.6e6  # energy released by one DT fusion reaction in eV
+SECONDS_PER_YEAR = 60 * 60 * 24 * 365.25  # one full power year
+ATOMIC_MASS_UNIT = 1.66054e-24  # in grams
+
+# multiplication factors between units of the same kind
+UNITS = {'cm3': 1., 'm3': 1e6, 'mm3': 1e-3,
+         's': 1., 'h': 60 * 60, 'day': 60 * 60 * 24, 'year': SECONDS_PER_YEAR,
+         'eV': 1., 'keV': 1e3, 'MeV': 1e6, 'J': 1. / EV_TO_JOULES}
+
+
+def _combine_units(units, other_units, operator):
+    if not other_units:
+        return units
+    if ' ' in other_units and operator == '/':
+        other_units = '(' + other_units + ')'
+    if not units:
+        return other_units if operator == '*' else '1 / ' + other_units
+    return '{} {} {}'.format(units, operator, other_units)
+
+
+class TallyField:
+    """The mean and standard deviation of a quantity in every mesh voxel (or tally bin).
+
+    Arithmetic with numbers, numpy arrays and other fields is done on whole
+    arrays at once. The standard deviation is propagated to first order assuming
+    the operands are independent, and numbers and arrays (such as volumes) are
+    treated as exact. units is a label which is carried through the arithmetic.
+    """
+
+    # numpy arrays on the left of an operator defer to the methods below
+    __array_ufunc__ = None
+
+    def __init__(self, mean, std_dev=None, units=''):
+        self.mean = np.asarray(mean, dtype=float)
+        self.std_dev = np.zeros_like(self.mean) if std_dev is None else np.asarray(std_dev, dtype=float)
+        self.units = units
+
+    @property
+    def rel_error(self):
+        error = np.zeros(self.mean.shape)
+        np.divide(self.std_dev, self.mean, out=error, where=self.mean != 0.)
+        return np.abs(error)
+
+    @staticmethod
+    def _operand(other):
+        if isinstance(other, TallyField):
+            return other.mean, other.std_dev, other.units
+        return np.asarray(other, dtype=float), 0., ''
+
+    def __neg__(self):
+        return TallyField(-self.mean, self.std_dev, self.units)
+
+    def __add__(self, other):
+        mean, std_dev, units = self._operand(other)
+        return TallyField(self.mean + mean, np.hypot(self.std_dev, std_dev), self.units or units)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        mean, std_dev, units = self._operand(other)
+        return TallyField(self.mean - mean, np.hypot(self.std_dev, std_dev), self.units or units)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        mean, std_dev, units = self._operand(other)
+        return TallyField(self.mean * mean, np.hypot(self.std_dev * mean, self.mean * std_dev),
+                          _combine_units(self.units, units, '*'))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        mean, std_dev, units = self._operand(other)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            quotient = np.where(mean != 0., self.mean / mean, 0.)
+            # relative errors add in quadrature
+            std_dev = np.where(mean != 0., np.hypot(self.std_dev / mean, quotient * std_dev / mean), 0.)
+        return TallyField(quotient, std_dev, _combine_units(self.units, units, '/'))
+
+    def __rtruediv__(self, other):
+        return TallyField(other) / self
+
+    def scale(self, factor, units=None):
+        """Returns the field multiplied by an exact factor, optionally with new units."""
+
+        return TallyField(self.mean * factor, self.std_dev * abs(factor), self.units if units is None else units)
+
+    def convert(self, from_units, to_units, power=1):
+        """Converts one unit in the field's units to another of the same kind, for example eV to J.
+
+        power is the power of the unit in the field's units, so a field per cm3 is
+        converted to per m3 with convert('cm3', 'm3', power=-1).
+        """
+
+        factor = (UNITS[from_units] / UNITS[to_units])**power
+        return self.scale(factor, re.sub(r'\b{}\b'.format(re.escape(from_units)), to_units, self.units))
+
+    def sum(self):
+        """Returns the total over all voxels as a single valued field."""
+
+        return TallyField(self.mean.sum(), np.sqrt(np.square(self.std_dev).sum()), self.units)
+
+    def arrays(self, name):
+        """Returns the field as {name: (mean, std_dev)}, as used by openmc-statepoint-3d.py."""
+
+        return {name: (self.mean, self.std_dev)}
+
+
+def source_strength(fusion_power, energy_per_fusion_reaction=DT_FUSION_ENERGY):
+    """Returns the number of neutrons per second from a fusion power in Watts (one neutron per reaction)."""
+
+    return fusion_power / (energy_per_fusion_reaction * EV_TO_JOULES)
+
+
+def number_density(density, atomic_mass):
+    """Returns the atoms per cm3 from a density in g/cm3 and an atomic mass in atomic mass units."""
+
+    return density / (atomic_mass * ATOMIC_MASS_UNIT)
+
+
+def mesh_volumes(mesh_type, grids):
+    """Returns the volume of every voxel in cm3 as a flat array in mesh order (first index fastest).
+
+    grids are the vertex grids from mesh_grids, angles in radians.
+    """
+
+    first, second, third = (np.asarray(grid, dtype=float) for grid in grids)
+    if mesh_type == 'regular':
+        factors = np.diff(first), np.diff(second), np.diff(third)
+    elif mesh_type == 'cylindrical':
+        # r, phi, z
+        factors = 0.5 * np.diff(first**2), np.diff(second), np.diff(third)
+    elif mesh_type == 'spherical':
+        # r, theta, phi
+        factors = np.diff(first**3) / 3., -np.diff(np.cos(second)), np.diff(third)
+    else:
+        raise ValueError('{} meshes are not supported'.format(mesh_type))
+    return np.einsum('k,j,i->kji', factors[2], factors[1], factors[0]).ravel()
+
+
+def per_second(field, fusion_power):
+    """Scales a tally per source neutron to a rate per second at the fusion power in Watts."""
+
+    return field.scale(source_strength(fusion_power), _combine_units(field.units, 's', '/'))
+
+
+def per_volume(field, volumes):
+    """Divides a tally in each voxel by the voxel volume in cm3."""
+
+    return TallyField(field.mean / volumes, field.std_dev / volumes, _combine_units(field.units, 'cm3', '/'))
+
+
+def dpa_per_full_power_year(damage_energy, atoms_per_cm3, volumes, fusion_power,
+                            displacement_energy=40., efficiency=0.8):
+    """Returns displacements per atom per full power year from a damage energy tally (MT 444) in eV per source neutron.
+
+    Uses the NRT model, efficiency * damage energy / (2 * displacement_energy)
+    displacements, where efficiency accounts for recombination. atoms_per_cm3 is
+    the number density of the material and can be an array with a value for each
+    voxel.
+    """
+
+    displacements = damage_energy.scale(efficiency / (2 * displacement_energy))
+    atoms = np.asarray(atoms_per_cm3, dtype=float) * volumes
+    dpa = displacements.scale(source_strength(fusion_power) * SECONDS_PER_YEAR) / atoms
+    dpa.units = 'DPA / FPY'
+    return dpa
+
+
+def tritium_production_rate(tritium_production, volumes, fusion_power):
+    """Returns tritium atoms produced per cm3 per second from a (n,Xt) tally in atoms per source neutron."""
+
+    rate = per_volume(per_second(tritium_production, fusion_power), volumes)
+    rate.units = 'atoms / cm3 / s'
+    return rate
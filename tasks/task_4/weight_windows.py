@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""weight_windows.py: makes mesh weight windows from a cheap flux run (the MAGIC method) and reports the figure of merit gained."""
+
+from collections import namedtuple
+
+import numpy as np
+import openmc
+
+from mesh_tally_vtk import write_vtr
+
+
+# the flux in every voxel (flat, x varying fastest) and the simulation time of a run in seconds
+FluxResult = namedtuple('FluxResult', ['mean', 'std_dev', 'runtime'])
+
+FLUX_TALLY_NAME = 'weight_window_flux'
+
+
+def magic_lower_bounds(mean, std_dev=None, max_rel_error=0.5, ratio=0.5, previous=None):
+    """Returns weight window lower bounds proportional to the flux, the MAGIC method.
+
+    The bounds are ratio times the flux over the highest flux, so particles
+    leaving the source with a weight of 1 start inside the window and are split as
+    they move to voxels with less flux. Voxels with no flux, or a relative error
+    above max_rel_error, get -1 (no weight window) or the bound from previous.
+    """
+
+    mean = np.asarray(mean, dtype=float)
+    scored = mean > 0.
+    if std_dev is not None and max_rel_error is not None:
+        rel_error = np.divide(std_dev, mean, out=np.full(mean.shape, np.inf), where=scored)
+        scored &= rel_error <= max_rel_error
+    if not np.any(scored):
+        raise ValueError('No voxels have a converged flux to make weight windows from')
+
+    bounds = np.where(scored, ratio * mean / mean[scored].max(), -1.)
+    if previous is not None:
+        bounds = np.where(scored, bounds, previous)
+    return bounds
+
+
+def read_flux(statepoint_filename, tally_name=FLUX_TALLY_NAME):
+    """Returns the FluxResult of the mesh flux tally in a statepoint."""
+
+    sp = openmc.StatePoint(statepoint_filename)
+    tally = sp.get_tally(name=tally_name)
+    result = FluxResult(np.nan_to_num(tally.mean.ravel()), np.nan_to_num(tally.std_dev.ravel()),
+                        sp.runtime['total simulation'])
+    sp.close()
+    return result
+
+
+def add_flux_tally(model, mesh, tally_name=FLUX_TALLY_NAME):
+    """Adds a flux tally on the weight window mesh to the model, unless it already has one."""
+
+    if not any(tally.name == tally_name for tally in model.tallies):
+        flux_tally = openmc.Tally(name=tally_name)
+        flux_tally.filters = [openmc.MeshFilter(mesh)]
+        flux_tally.scores = ['flux']
+        model.tallies.append(flux_tally)
+
+
+def generate_weight_windows(model, mesh, iterations=2, particles=1000, batches=10, upper_bound_ratio=5.,
+                            max_rel_error=0.5):
+    """Runs cheap passes of the model, each with the weight windows from the last, and sets the final windows on its settings.
+
+    The first pass is analog, so the model should not have weight windows yet.
+    Each later pass reaches further into the shielding, filling in voxels the
+    earlier passes did not score. The number of particles and batches of the model
+    are put back afterwards for the production run. Returns the
+    openmc.WeightWindows and the FluxResult of every pass.
+    """
+
+    add_flux_tally(model, mesh)
+    production = model.settings.particles, model.settings.batches
+    model.settings.particles, model.settings.batches = particles, batches
+
+    results = []
+    bounds = None
+    weight_windows = None
+    try:
+        for iteration in range(iterations):
+            result = read_flux(model.run())
+            results.append(result)
+            bounds = magic_lower_bounds(result.mean, result.std_dev, max_rel_error, previous=bounds)
+            print('Weight window pass {}: {} of {} voxels have weight windows'.format(
+                iteration + 1, np.count_nonzero(bounds > 0), bounds.size))
+
+            # the flat bounds are in mesh order (x varies fastest), OpenMC takes them as (nx, ny, nz, energy groups)
+            lower_bounds = bounds.reshape(tuple(mesh.dimension)[::-1]).T[..., np.newaxis]
+            weight_windows = openmc.WeightWindows(mesh, lower_bounds, upper_bound_ratio=upper_bound_ratio)
+            model.settings.weight_windows = weight_windows
+    finally:
+        model.settings.particles, model.settings.batches = production
+
+    return weight_windows, results
+
+
+def figure_of_merit(result):
+    """Returns 1 / (relative error squared * runtime) in every voxel, 0 where the voxel was not scored."""
+
+    rel_error = np.divide(result.std_dev, result.mean, out=np.zeros(result.mean.shape), where=result.mean > 0.)
+    return np.divide(1., rel_error**2 * result.runtime, out=np.zeros(rel_error.shape), where=rel_error > 0.)
+
+
+def fom_gain(reference, result):
+    """Returns the figure of merit of result over that of reference in every voxel.
+
+    Voxels the reference did not score are inf if result scored them and nan if neither did.
+    """
+
+    reference_fom = figure_of_merit(reference)
+    fom = figure_of_merit(result)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return fom / reference_fom
+
+
+def report_fom_gain(reference, result, coordinates=None, output=None):
+    """Prints a summary of the figure of merit gain and optionally writes it to a .vtr file on the mesh coordinates."""
+
+    gain = fom_gain(reference, result)
+    both = np.isfinite(gain)
+    summary = {'voxels': int(gain.size),
+               'voxels scored by the reference': int(np.count_nonzero(reference.mean > 0.)),
+               'voxels scored': int(np.count_nonzero(result.mean > 0.)),
+               'voxels only scored with weight windows': int(np.count_nonzero(np.isinf(gain))),
+               'median gain': float(np.median(gain[both])) if np.any(both) else None,
+               'minimum gain': float(gain[both].min()) if np.any(both) else None,
+               'maximum gain': float(gain[both].max()) if np.any(both) else None}
+    for key, value in summary.items():
+        print('{}: {}'.format(key, value))
+
+    if output is not None:
+        # voxels without a finite gain are written as 0 so they do not hide the rest in paraview
+        write_vtr(coordinates, {'fom_gain': np.where(both, gain, 0.),
+                                'figure_of_merit': figure_of_merit(result),
+                                'reference_figure_of_merit': figure_of_merit(reference)}, output)
+
+    return summary
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""3_find_dpa_on_mesh.py: Calculates the DPA per full power year in every voxel of a spherical mesh over the first wall."""
+
+import openmc
+import json
+import os
+import sys
+import numpy as np
+
+# tally_arithmetic.py is shared with task 4
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_4'))
+from tally_arithmetic import TallyField, dpa_per_full_power_year, mesh_volumes, number_density
+
+
+# MATERIALS
+
+density_of_iron_in_g_per_cm3 = 7.75
+firstwall_material = openmc.Material(name='Iron')
+firstwall_material.set_density('g/cm3', density_of_iron_in_g_per_cm3)
+firstwall_material.add_element('Fe', 1.0, percent_type='wo')
+
+breeder_material = openmc.Material(name="Lithium")
+breeder_material.set_density('g/cm3', 2.0)
+breeder_material.add_element('Li', 1.0, percent_type='ao')
+
+mats = openmc.Materials([firstwall_material, breeder_material])
+
+
+# GEOMETRY
+
+# surfaces
+vessel_inner = openmc.Sphere(r=500)
+first_wall_outer_surface = openmc.Sphere(r=510)
+breeder_blanket_outer_surface = openmc.Sphere(r=610, boundary_type='vacuum')
+
+# cells
+inner_vessel_region = -vessel_inner
+inner_vessel_cell = openmc.Cell(region=inner_vessel_region)
+# filled with void by default
+
+first_wall_region = -first_wall_outer_surface & +vessel_inner
+first_wall_cell = openmc.Cell(region=first_wall_region)
+first_wall_cell.fill = firstwall_material
+
+breeder_blanket_region = +first_wall_outer_surface & -breeder_blanket_outer_surface
+breeder_blanket_cell = openmc.Cell(region=breeder_blanket_region)
+breeder_blanket_cell.fill = breeder_material
+
+universe = openmc.Universe(cells=[inner_vessel_cell,first_wall_cell, breeder_blanket_cell])
+geom = openmc.Geometry(universe)
+
+
+
+# SIMULATION SETTINGS
+
+# Instantiate a Settings object
+sett = openmc.Settings()
+batches = 10
+sett.batches = batches
+sett.inactive = 0
+sett.particles = 10000
+sett.run_mode = 'fixed source'
+
+# Create a DT point source
+source = openmc.Source()
+source.space = openmc.stats.Point((0, 0, 0))
+source.angle = openmc.stats.Isotropic()
+source.energy = openmc.stats.Discrete([14e6], [1])
+sett.source = source
+
+
+tallies = openmc.Tallies()
+
+# a spherical mesh that exactly covers the first wall, split into 2 layers, 18 polar and 36 azimuthal bins
+mesh = openmc.SphericalMesh()
+mesh.r_grid = np.linspace(500, 510, 3)
+mesh.theta_grid = np.linspace(0, np.pi, 19)
+mesh.phi_grid = np.linspace(0, 2 * np.pi, 37)
+
+# damage energy (MT 444) in eV per source neutron in each voxel
+mesh_filter = openmc.MeshFilter(mesh)
+reaction_tally = openmc.Tally(name='DPA_on_mesh')
+reaction_tally.filters = [mesh_filter]
+reaction_tally.scores = ['444']
+tallies.append(reaction_tally)
+
+
+# Run OpenMC!
+model = openmc.model.Model(geom, mats, sett, tallies)
+sp_filename = model.run()
+
+# open the results file
+sp = openmc.StatePoint(sp_filename)
+
+# access the tally
+tally = sp.get_tally(name='DPA_on_mesh')
+
+damage_energy = TallyField(tally.mean.ravel(), tally.std_dev.ravel(), 'eV')
+
+# the same steps as 1_find_dpa.py, done for every voxel at once with the errors carried through
+iron_atoms_per_cm3 = number_density(density_of_iron_in_g_per_cm3, 55.845)
+volumes = mesh_volumes('spherical', [mesh.r_grid, mesh.theta_grid, mesh.phi_grid])
+dpa = dpa_per_full_power_year(damage_energy, iron_atoms_per_cm3, volumes, fusion_power=3e9,
+                              displacement_energy=40., efficiency=0.8)
+
+peak = int(np.argmax(dpa.mean))
+print('Peak DPA per full power year', dpa.mean[peak], '+/-', dpa.std_dev[peak])
+print('Average DPA per full power year', np.average(dpa.mean, weights=volumes))
+print('Peak DPA after 5 full power years', 5 * dpa.mean[peak], 'compared to the Eurofer limit of 70 DPA\n')
+
+json_output = {'Peak DPA per full power year': float(dpa.mean[peak]),
+               'Peak DPA per full power year std_dev': float(dpa.std_dev[peak]),
+               'Average DPA per full power year': float(np.average(dpa.mean, weights=volumes))}
+
+with open('3_find_dpa_on_mesh_results.json', 'w') as file_object:
+    json.dump(json_output, file_object, indent=2)
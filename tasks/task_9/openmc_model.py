@@ -1,7 +1,11 @@
 import os
+import sys
 
 import openmc
-from neutronics_material_maker import Material
+
+# simulate_model is called many times, so materials come from the memoized factory of task 11
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_11'))
+from material_factory import make_material
 
 
 def objective(x):
@@ -27,13 +31,13 @@ def simulate_model(enrichment,
                    inner_radius=500):
 
     # MATERIALS from library of materials in neutronics_material_maker package
-    breeder_material = Material(material_name=breeder_material_name,
-                                enrichment=enrichment,
-                                temperature_in_C=temperature_in_C,
-                                ).neutronics_material
+    breeder_material = make_material(material_name=breeder_material_name,
+                                     enrichment=enrichment,
+                                     temperature_in_C=temperature_in_C,
+                                     )
 
-    SS316 = Material(material_name="SS316").neutronics_material
-    copper = Material(material_name="copper").neutronics_material
+    SS316 = make_material(material_name="SS316")
+    copper = make_material(material_name="copper")
 
     mats = openmc.Materials([breeder_material, SS316, copper])
     mats.export_to_xml("materials.xml")
@@ -51,3 +51,38 @@ class test_task_1(unittest.TestCase):
         os.system('python 3_example_material_plot.py')
         assert Path(output_filename).exists() == True
         os.system('rm '+output_filename)
+
+
+    def test_task_1_part_4(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_1'))
+        output_filename = '4_example_enrichment_sweep.html'
+        os.system('rm '+output_filename)
+        os.system('python 4_example_enrichment_sweep.py')
+        assert Path(output_filename).exists() == True
+        os.system('rm '+output_filename)
+
+
+    def test_task_1_part_5(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_1'))
+        output_filename = '5_example_isotope_temperature_plot.html'
+        os.system('rm '+output_filename)
+        os.system('python 5_example_isotope_temperature_plot.py')
+        assert Path(output_filename).exists() == True
+        os.system('rm '+output_filename)
+
+
+    def test_task_1_part_6(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_1'))
+        output_filenames = ['6_example_breeder_screening.html', 'breeder_library.npz']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
+        os.system('python 6_example_breeder_screening.py')
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
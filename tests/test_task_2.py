@@ -61,8 +61,10 @@ class test_task_2(unittest.TestCase):
 
         os.chdir(Path(cwd))
         os.chdir(Path('tasks/task_2'))
-        output_filename = 'plot_3d_tokamak.vti'
-        os.system('rm '+output_filename)
+        output_filenames = ['plot_3d_tokamak.vti', 'xz_tokamak.png', 'xy_tokamak.png', 'yz_tokamak.png']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
         os.system('python 4_example_geometry_viewer_3d_tokamak.py')
-        assert Path(output_filename).exists() == True
-        os.system('rm '+output_filename)
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
@@ -11,7 +11,9 @@
 # this will have to be implemented
 
 from pathlib import Path 
+import json
 import os
+import sys
 import pytest
 import unittest
 
@@ -44,11 +46,13 @@ class test_task_3(unittest.TestCase):
 
         os.chdir(Path(cwd))
         os.chdir(Path('tasks/task_3'))
-        output_filename = 'particle_direction.html'
-        os.system('rm '+output_filename)
+        output_filenames = ['particle_direction.html', 'particle_direction_sky_map.html']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
         os.system('python 3_plot_neutron_birth_direction.py')
-        assert Path(output_filename).exists() == True
-        os.system('rm '+output_filename)
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
 
 
     def test_task_3_part_4(self):
@@ -66,21 +70,69 @@ class test_task_3(unittest.TestCase):
 
         os.chdir(Path(cwd))
         os.chdir(Path('tasks/task_3'))
-        output_filename = 'plasma_particle_direction.html'
-        os.system('rm '+output_filename)
+        output_filenames = ['plasma_particle_direction.html', 'plasma_particle_direction_sky_map.html']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
         os.system('python 5_plot_neutron_birth_direction_plasma.py')
-        assert Path(output_filename).exists() == True
-        os.system('rm '+output_filename)
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
 
 
     def test_task_3_part_6(self):
 
         os.chdir(Path(cwd))
         os.chdir(Path('tasks/task_3'))
-        output_filenames = ['plot_3d.h5', 'plot_3d.vti', 'track_1_1_4.h5', 'track_1_1_4.pvtp', 'track_1_1_4_0.vtp']
+        output_filenames = ['plot_3d.h5', 'plot_3d.vti', 'track_1_1_4.h5', 'tracks.vtp']
         for output_filename in output_filenames:
             os.system('rm '+output_filename)
         os.system('python 6_example_neutron_tracks.py')
         for output_filename in output_filenames:
             assert Path(output_filename).exists() == True
             os.system('rm '+output_filename)
+
+
+    def test_task_3_part_7(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_3'))
+        output_filename = 'source_preview_energy_histogram.html'
+        os.system('rm '+output_filename)
+        os.system('python 7_preview_source_distributions.py')
+        assert Path(output_filename).exists() == True
+        os.system('rm '+output_filename)
+
+
+    def test_task_3_part_7_muir_width(self):
+
+        os.chdir(Path(cwd))
+        sys.path.insert(0, str(Path('tasks/task_3').resolve()))
+        import openmc
+        from source_sampler import sample_source
+
+        # a D-T plasma at 20 keV has a neutron energy spread of about 75 * sqrt(20) keV
+        source = openmc.Source()
+        source.space = openmc.stats.Point((0, 0, 0))
+        source.energy = openmc.stats.Muir(e0=14.08e6, m_rat=5., kt=20000.)
+        samples = sample_source(source, 1000000, seed=1)
+        expected_std_dev = 75e3 * 20**0.5
+        assert abs(samples['E'].std() - expected_std_dev) / expected_std_dev < 0.01
+        assert abs(samples['E'].mean() - 14.08e6) < 1e3
+
+    def test_task_3_part_8(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_3'))
+        output_filenames = ['plasma_source_preview.html', 'plasma_source_comparison.json']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
+        os.system('python 8_preview_plasma_source.py')
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+        with open('plasma_source_comparison.json') as file_object:
+            comparison = json.load(file_object)
+        # the numpy sampler and the compiled source agree to within the KS critical value, both are seeded so this is repeatable
+        for name, result in comparison.items():
+            assert result['KS statistic'] < result['critical value'], name
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
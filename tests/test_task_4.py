@@ -11,6 +11,10 @@
 
 from pathlib import Path 
 import os
+import sys
+import tempfile
+import h5py
+import numpy as np
 import pytest
 import unittest
 
@@ -34,9 +38,91 @@ class test_task_4(unittest.TestCase):
 
         os.chdir(Path(cwd))
         os.chdir(Path('tasks/task_4'))
-        output_filename = 'tally_on_mesh.vtk'
-        os.system('rm '+output_filename)
+        output_filenames = ['tally_on_mesh.vtk', 'tally_on_cylindrical_mesh.vtk', 'tally_on_mesh_xy.png', 'tally_on_mesh_xz.png', 'tally_on_mesh_profile.png']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
         os.system('python 2_example_neutron_flux_tokamak.py')
-        assert Path(output_filename).exists() == True
-        os.system('rm '+output_filename)
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
+
+    def test_task_4_part_3(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_4'))
+        output_filenames = ['fom_gain.vtr', '3_example_weight_windows_tokamak_results.json']
+        for output_filename in output_filenames:
+            os.system('rm '+output_filename)
+        os.system('python 3_example_weight_windows_tokamak.py')
+        for output_filename in output_filenames:
+            assert Path(output_filename).exists() == True
+            os.system('rm '+output_filename)
+
+    def test_task_4_weight_windows(self):
+
+        os.chdir(Path(cwd))
+        sys.path.insert(0, str(Path('tasks/task_4').resolve()))
+        from weight_windows import FluxResult, fom_gain, magic_lower_bounds
+
+        # the third voxel has a relative error of 2 and the fourth was not scored
+        bounds = magic_lower_bounds([4., 2., 1., 0.], [0.4, 0.2, 2., 0.], max_rel_error=0.5, ratio=0.5)
+        assert np.allclose(bounds, [0.5, 0.25, -1., -1.])
+        bounds = magic_lower_bounds([4., 2., 1., 0.], [0.4, 0.2, 2., 0.], previous=[0.1, 0.1, 0.1, -1.])
+        assert np.allclose(bounds, [0.5, 0.25, 0.1, -1.])
+        with pytest.raises(ValueError):
+            magic_lower_bounds([0., 0.])
+
+        # figures of merit 10 and 0.4 for the reference and 20, 0.2 and 5 with weight windows
+        reference = FluxResult(np.array([1., 1., 0., 0.]), np.array([0.1, 0.5, 0., 0.]), 10.)
+        result = FluxResult(np.array([1., 1., 1., 0.]), np.array([0.05, 0.5, 0.1, 0.]), 20.)
+        gain = fom_gain(reference, result)
+        assert np.allclose(gain[:2], [2., 0.5])
+        assert np.isinf(gain[2])
+        assert np.isnan(gain[3])
+
+    def test_task_4_mesh_tally_cache(self):
+
+        os.chdir(Path(cwd))
+        sys.path.insert(0, str(Path('tasks/task_4').resolve()))
+        from mesh_tally_cache import open_cache
+
+        with tempfile.TemporaryDirectory() as directory:
+            # a statepoint with two flux tallies on a 4 x 3 x 2 regular mesh
+            statepoint_filename = os.path.join(directory, 'statepoint.2.h5')
+            results = {}
+            with h5py.File(statepoint_filename, 'w') as f:
+                mesh = f.create_group('tallies/meshes/mesh 1')
+                mesh['type'] = b'regular'
+                mesh['dimension'] = np.array([4, 3, 2])
+                mesh['lower_left'] = np.array([0., 0., 0.])
+                mesh['upper_right'] = np.array([4., 3., 2.])
+                mesh_filter = f.create_group('tallies/filters/filter 1')
+                mesh_filter['type'] = b'mesh'
+                mesh_filter['n_bins'] = 24
+                mesh_filter['bins'] = np.array([1])
+                for tally_id in (1, 2):
+                    tally = f.create_group('tallies/tally {}'.format(tally_id))
+                    tally['n_realizations'] = 5
+                    tally['n_filters'] = 1
+                    tally['filters'] = np.array([1])
+                    tally['score_bins'] = np.array([b'flux'])
+                    tally['nuclides'] = np.array([b'total'])
+                    sums = np.random.default_rng(tally_id).random((24, 1)) * 5
+                    tally['results'] = np.stack([sums, sums**2 / 4], axis=-1)
+                    results[tally_id] = sums[:, 0] / 5
+
+            cache = open_cache(statepoint_filename, [1])
+            assert cache.tally_ids == [1]
+            cache = open_cache(statepoint_filename, [1, 2])
+            # tally 2 is added to the index rather than replacing tally 1
+            assert sorted(cache.tally_ids) == [1, 2]
+            for tally_id in (1, 2):
+                assert np.allclose(cache.mean(tally_id, 'flux', 'total').ravel(), results[tally_id])
+            assert not Path(cache.directory, 'index.json.tmp').exists()
 
+            # a cache made from another statepoint is replaced, not reused
+            other_filename = os.path.join(directory, 'other.h5')
+            os.system('cp ' + statepoint_filename + ' ' + other_filename)
+            cache = open_cache(other_filename, [2], cache.directory)
+            assert cache.tally_ids == [2]
+            assert cache.index['statepoint'] == os.path.abspath(other_filename)
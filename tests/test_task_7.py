@@ -40,3 +40,12 @@ class test_task_7(unittest.TestCase):
         assert Path(output_filename).exists() == True
         os.system('rm '+output_filename)
 
+    def test_task_7_part_3(self):
+
+        os.chdir(Path(cwd))
+        os.chdir(Path('tasks/task_7'))
+        output_filename = '3_find_dpa_on_mesh_results.json'
+        os.system('rm '+output_filename)
+        os.system('python 3_find_dpa_on_mesh.py')
+        assert Path(output_filename).exists() == True
+        os.system('rm '+output_filename)